@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import random
+import time
+import numpy as np
+from engine import BoardEngine
+from main import MinesweeperAI
+from solver import LogicSolver
+
+SIZES = [5, 10, 20, 50, 100]
+DENSITIES = [0.10, 0.15, 0.20]
+
+def opened_board(rows, cols, mines):
+    """A fresh board with first_move spent, plus an empty safe cell to dig (or any safe cell)"""
+    board = BoardEngine(rows, cols, mines)
+    board.first_move = False
+    empty = np.argwhere(~board.mine & (board.clues == 0))
+    cells = empty if len(empty) else np.argwhere(~board.mine)
+    x, y = cells[len(cells) // 2]
+    return board, int(x), int(y)
+
+def played_board(rows, cols, mines):
+    """A board after its opening dig, as seen by the network mid-game"""
+    board, x, y = opened_board(rows, cols, mines)
+    board.dig(x, y)
+    return board
+
+def bench_init(rows, cols, mines):
+    start = time.perf_counter()
+    BoardEngine(rows, cols, mines)
+    return time.perf_counter() - start
+
+def bench_dig(rows, cols, mines):
+    board, x, y = opened_board(rows, cols, mines)
+    start = time.perf_counter()
+    board.dig(x, y)
+    return time.perf_counter() - start
+
+def bench_first_dig(rows, cols, mines):
+    """First dig of a deferred board, which also places the mines and clues"""
+    board = BoardEngine(rows, cols, mines, deferred=True)
+    start = time.perf_counter()
+    board.dig(rows // 2, cols // 2)
+    return time.perf_counter() - start
+
+def bench_get_state(rows, cols, mines):
+    board = played_board(rows, cols, mines)
+    start = time.perf_counter()
+    board.get_state()
+    return time.perf_counter() - start
+
+def bench_get_flat_state(rows, cols, mines):
+    board = played_board(rows, cols, mines)
+    start = time.perf_counter()
+    board.get_flat_state()
+    return time.perf_counter() - start
+
+def bench_check_win(rows, cols, mines):
+    board = played_board(rows, cols, mines)
+    start = time.perf_counter()
+    board.check_win()
+    return time.perf_counter() - start
+
+def bench_logic(rows, cols, mines):
+    ai = MinesweeperAI(rows, cols, mines)
+    ai.board = played_board(rows, cols, mines)
+    ai.solver = LogicSolver(ai.board)
+    start = time.perf_counter()
+    ai.use_logic_first()
+    return time.perf_counter() - start
+
+BENCHMARKS = {
+    'init': bench_init,
+    'dig': bench_dig,
+    'first_dig': bench_first_dig,
+    'get_state': bench_get_state,
+    'get_flat_state': bench_get_flat_state,
+    'check_win': bench_check_win,
+    'logic': bench_logic,
+}
+
+def run(names=None, sizes=SIZES, densities=DENSITIES, repeat=20, seed=0):
+    """Time every benchmark on every size and density; return {case: stats}
+
+    Each repetition builds its own board outside the timed region, and the
+    same seed gives the same boards, so two runs time identical work.
+    Medians are the numbers to compare; they are the least noisy.
+    """
+    results = {}
+    for name in names or list(BENCHMARKS):
+        function = BENCHMARKS[name]
+        for size in sizes:
+            for density in densities:
+                mines = max(1, round(size * size * density))
+                function(size, size, mines)  # Warm up caches before timing
+                random.seed(f"{seed}-{name}-{size}-{density}")
+                times = [function(size, size, mines) for _ in range(repeat)]
+                results[f"{name}/{size}x{size}/{density:.2f}"] = {
+                    'min': min(times),
+                    'median': float(np.median(times)),
+                    'mean': sum(times) / len(times),
+                }
+    return results
+
+def compare(results, baseline):
+    """Print the median of every case next to the baseline median"""
+    print(f"{'case':<30} {'median':>12} {'baseline':>12} {'ratio':>8}")
+    for case, stats in results.items():
+        base = baseline.get(case)
+        if base is None:
+            print(f"{case:<30} {stats['median'] * 1e6:>10.1f}us {'-':>12} {'-':>8}")
+            continue
+        ratio = stats['median'] / base['median'] if base['median'] else float('inf')
+        print(f"{case:<30} {stats['median'] * 1e6:>10.1f}us {base['median'] * 1e6:>10.1f}us {ratio:>7.2f}x")
+
+def report(results):
+    print(f"{'case':<30} {'min':>12} {'median':>12}")
+    for case, stats in results.items():
+        print(f"{case:<30} {stats['min'] * 1e6:>10.1f}us {stats['median'] * 1e6:>10.1f}us")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the board engine hot paths")
+    parser.add_argument("--bench", action="append", choices=list(BENCHMARKS),
+                        help="Benchmark to run, may be repeated (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Board side lengths")
+    parser.add_argument("--densities", type=float, nargs="+", default=DENSITIES, help="Mine densities")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per case")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the boards")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline file")
+    args = parser.parse_args(argv)
+
+    results = run(args.bench, args.sizes, args.densities, args.repeat, args.seed)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+    else:
+        report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'numpy': np.__version__,
+                'repeat': args.repeat,
+                'seed': args.seed,
+                'results': results,
+            }, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import neat
+from main import MinesweeperAI
+import genome_io
+from corpus import Corpus
+from settings import DIFFICULTY_SETTINGS
+
+Z_95 = 1.959964  # Normal quantile for a two-sided 95% interval
+
+def wilson_interval(successes, trials, z=Z_95):
+    """95% Wilson score interval for a win rate"""
+    if trials == 0:
+        return 0.0, 0.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+def mean_interval(values, z=Z_95):
+    """Mean of the values with a normal 95% interval"""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    mean = sum(values) / n
+    if n == 1:
+        return mean, mean, mean
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    margin = z * math.sqrt(variance / n)
+    return mean, mean - margin, mean + margin
+
+def load_network(config_file, genome_file):
+    """Load a saved genome and build its network once"""
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    return genome_io.load_network(genome_file, config)
+
+def benchmark_difficulty(net, difficulty, num_games, seed=0, use_probabilities=False):
+    """Play num_games seeded games on one difficulty; return a dict of results"""
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    ai = MinesweeperAI(settings['ROWS'], settings['COLS'], settings['AMOUT_MINES'],
+                       use_probabilities=use_probabilities)
+    games = []
+
+    start = time.perf_counter()
+    for i in range(num_games):
+        # Every game has its own seed, so any single game can be replayed
+        ai.rng = random.Random(f"{seed}-{difficulty}-{i}")
+        ai.play_game(net)
+        games.append(ai.game_stats())
+    return summarize(difficulty, games, time.perf_counter() - start)
+
+def benchmark_corpus(net, corpus, num_games=None, use_probabilities=False):
+    """Replay the boards of a corpus, all of them or the first num_games"""
+    ai = MinesweeperAI(corpus.rows, corpus.cols, corpus.mines, use_probabilities=use_probabilities)
+    games = []
+
+    start = time.perf_counter()
+    for index in range(min(num_games or len(corpus), len(corpus))):
+        ai.play_game(net, corpus.board(index), corpus.first_click(index))
+        games.append(ai.game_stats())
+    return summarize(corpus.path, games, time.perf_counter() - start)
+
+def summarize(label, games, elapsed):
+    """Turn the game_stats of every game into a dict of results"""
+    num_games = len(games)
+    wins = sum(game['won'] for game in games)
+    moves = sum(game['moves'] for game in games)
+    win_low, win_high = wilson_interval(wins, num_games)
+    return {
+        'difficulty': label,
+        'games': num_games,
+        'wins': wins,
+        'win_rate': wins / num_games if num_games else 0.0,
+        'win_rate_ci': [win_low, win_high],
+        'safe_revealed': mean_interval([game['safe_revealed'] for game in games]),
+        'guesses': mean_interval([game['guesses'] for game in games]),
+        'seconds': elapsed,
+        'games_per_second': num_games / elapsed if elapsed else 0.0,
+        'moves_per_second': moves / elapsed if elapsed else 0.0,
+    }
+
+def run_benchmark(config_file, genome_file, num_games=1000, difficulties=None, seed=0,
+                  use_probabilities=False, corpus_file=None):
+    """Benchmark a saved genome on each difficulty, or on a corpus; return a list of result dicts"""
+    net = load_network(config_file, genome_file)
+    if corpus_file:
+        return [benchmark_corpus(net, Corpus(corpus_file), num_games, use_probabilities)]
+    difficulties = difficulties or list(DIFFICULTY_SETTINGS)
+    return [benchmark_difficulty(net, difficulty, num_games, seed, use_probabilities)
+            for difficulty in difficulties]
+
+def print_report(results):
+    width = max([10] + [len(str(r['difficulty'])) for r in results])
+    print(f"{'difficulty':<{width}} {'games':>6} {'win rate (95% CI)':>26} "
+          f"{'safe cells':>20} {'guesses':>18} {'games/s':>9} {'moves/s':>9}")
+    for r in results:
+        low, high = r['win_rate_ci']
+        safe, safe_low, safe_high = r['safe_revealed']
+        guess, guess_low, guess_high = r['guesses']
+        print(f"{r['difficulty']:<{width}} {r['games']:>6} "
+              f"{r['win_rate']:>8.1%} [{low:>6.1%}, {high:>6.1%}] "
+              f"{safe:>7.2f} ±{(safe_high - safe_low) / 2:>6.2f}    "
+              f"{guess:>6.2f} ±{(guess_high - guess_low) / 2:>5.2f}    "
+              f"{r['games_per_second']:>9.1f} {r['moves_per_second']:>9.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a trained genome without visualization")
+    parser.add_argument("--config", default="neat-config.txt", help="NEAT config file")
+    parser.add_argument("--genome", default=None, help="Saved genome to benchmark (default: the best genome)")
+    parser.add_argument("--games", type=int, default=1000, help="Games per difficulty")
+    parser.add_argument("--difficulty", action="append", choices=list(DIFFICULTY_SETTINGS),
+                        help="Difficulty to run, may be repeated (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the game sequence")
+    parser.add_argument("--probabilities", action="store_true",
+                        help="Restrict network moves to the least risky tiles")
+    parser.add_argument("--corpus", metavar="PATH",
+                        help="Replay the boards of a corpus file instead (--games limits how many)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.config, args.genome or genome_io.find_genome_file(), args.games, args.difficulty, args.seed,
+                            args.probabilities, args.corpus)
+    print_report(results)
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import random
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from engine import BoardEngine
+from settings import DIFFICULTY_SETTINGS, FIRST_CLICK_SAFE_RADIUS
+
+class BoardSet:
+    """A fixed list of seeded boards that every genome of a generation plays
+
+    Only the mine masks are stored, bit-packed one after another in a single
+    uint8 buffer; specs holds (rows, cols, mines, byte offset) per board. The
+    buffer can live in shared memory, so worker processes read the same bytes
+    through a NumPy view instead of receiving or regenerating the boards.
+    Layouts are drawn around the centre cell, where play_game clicks first.
+    """
+    def __init__(self, specs, packed, shm=None, key=None):
+        self.specs = specs
+        self.packed = packed
+        self.shm = shm  # Shared memory block backing packed, if any
+        self.key = key  # Identifies the layouts, e.g. for caching results on them
+
+    @staticmethod
+    def generate(num_boards, seed, difficulties=None):
+        """Draw num_boards boards of random difficulties from one seeded generator"""
+        rng = random.Random(seed)
+        difficulties = difficulties or list(DIFFICULTY_SETTINGS)
+        specs, chunks, offset = [], [], 0
+        for _ in range(num_boards):
+            settings = DIFFICULTY_SETTINGS[rng.choice(difficulties)]
+            rows, cols, mines = settings['ROWS'], settings['COLS'], settings['AMOUT_MINES']
+            board = BoardEngine(rows, cols, mines, rng, deferred=True)
+            board.place_mines(rows // 2, cols // 2, FIRST_CLICK_SAFE_RADIUS)
+            chunk = np.packbits(board.mine.ravel())
+            specs.append((rows, cols, mines, offset))
+            chunks.append(chunk)
+            offset += len(chunk)
+        packed = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
+        return BoardSet(specs, packed, key=(seed, num_boards, tuple(difficulties)))
+
+    def __len__(self):
+        return len(self.specs)
+
+    def mine_mask(self, index):
+        """Unpack the (rows, cols) mine mask of one board"""
+        rows, cols, _, offset = self.specs[index]
+        size = rows * cols
+        bits = self.packed[offset:offset + (size + 7) // 8]
+        return np.unpackbits(bits, count=size).astype(bool).reshape(rows, cols)
+
+    def board(self, index):
+        """A fresh BoardEngine with the layout of one board"""
+        rows, cols, mines, _ = self.specs[index]
+        board = BoardEngine(rows, cols, mines, deferred=True)
+        board.set_layout(self.mine_mask(index))
+        return board
+
+    def share(self):
+        """Copy the masks into shared memory; return the descriptor workers attach with"""
+        if self.shm is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, self.packed.nbytes))
+            view = np.ndarray(self.packed.shape, dtype=np.uint8, buffer=self.shm.buf)
+            view[:] = self.packed
+            self.packed = view
+        return self.shm.name, self.specs, self.packed.nbytes
+
+    @staticmethod
+    def attach(descriptor):
+        """Open a shared board set without copying the masks"""
+        name, specs, nbytes = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        # Only the creator owns the block; keep this process's tracker from unlinking it at exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        packed = np.ndarray((nbytes,), dtype=np.uint8, buffer=shm.buf)
+        return BoardSet(specs, packed, shm)
+
+    def close(self, unlink=False):
+        """Release the shared memory; the owner also unlinks it"""
+        if self.shm is not None:
+            self.packed = np.array(self.packed)  # Keep a private copy after the block goes
+            self.shm.close()
+            if unlink:
+                self.shm.unlink()
+            self.shm = None
+
+class BoardSetSchedule:
+    """Hand out the board set of every generation, fixed or rotating
+
+    A fixed schedule reuses one set for the whole run, so fitness is
+    comparable across generations. A rotating one draws a new set each
+    generation from the base seed and the generation number, so genomes
+    cannot overfit a handful of layouts.
+    """
+    def __init__(self, num_boards, seed, rotate=True):
+        self.num_boards = num_boards
+        self.seed = seed
+        self.rotate = rotate
+        self.generation = 0
+        self.current = None
+
+    def next_set(self):
+        """The board set for the next generation"""
+        if self.current is None or self.rotate:
+            if self.current is not None:
+                self.current.close(unlink=True)
+            self.current = BoardSet.generate(self.num_boards, f"{self.seed}-{self.generation}")
+        self.generation += 1
+        return self.current
+
+    def close(self):
+        if self.current is not None:
+            self.current.close(unlink=True)
+            self.current = None
@@ -0,0 +1,87 @@
+import gzip
+import os
+import pickle
+import random
+import threading
+import neat
+from settings import CHECKPOINT_SUFFIX
+
+class AsyncCheckpointer(neat.Checkpointer):
+    """neat.Checkpointer that compresses and writes checkpoints in a background thread
+
+    The population is pickled in the generation loop, which is the snapshot,
+    and the much slower gzip compression and disk write happen while the
+    next generation is evaluated. Files are written under a temporary name
+    and renamed into place, so a crash never leaves half a checkpoint, and
+    only the newest `keep` checkpoints are kept. The files are the same as
+    neat.Checkpointer's, so neat.Checkpointer.restore_checkpoint reads them.
+    """
+    def __init__(self, generation_interval=5, filename_prefix='neat-checkpoint-', keep=3,
+                 time_interval_seconds=None):
+        super().__init__(generation_interval, time_interval_seconds, filename_prefix)
+        self.keep = keep
+        self.writer = None
+
+    def __getstate__(self):
+        # The species set pickled into every checkpoint holds the reporters, this one included
+        state = self.__dict__.copy()
+        state['writer'] = None
+        return state
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        data = pickle.dumps((generation, config, population, species_set, random.getstate()),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        filename = f"{self.filename_prefix}{generation}"
+        print(f"Saving checkpoint to {filename}")
+        # One write at a time keeps the files in generation order
+        self.wait()
+        self.writer = threading.Thread(target=self.write, args=(filename, data))
+        self.writer.start()
+
+    def write(self, filename, data):
+        try:
+            temporary = f"{filename}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=5))
+            os.replace(temporary, filename)
+            self.prune()
+        except OSError as e:
+            print(f"Failed to write checkpoint {filename}: {e}")
+
+    def prune(self):
+        """Delete all but the newest `keep` checkpoints"""
+        if not self.keep:
+            return
+        for _, filename in list_checkpoints(self.filename_prefix)[:-self.keep]:
+            os.remove(filename)
+
+    def wait(self):
+        """Block until the checkpoint being written is on disk"""
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+
+def checkpoint_prefix(genome_file):
+    """Checkpoint prefix of a run saving its best genome to genome_file
+
+    best_genome.bin goes with best_genome-checkpoint-<generation>, so every
+    run keeps, prunes and resumes only its own checkpoints.
+    """
+    return os.path.splitext(genome_file)[0] + CHECKPOINT_SUFFIX
+
+def list_checkpoints(filename_prefix='neat-checkpoint-'):
+    """(generation, path) of every checkpoint, oldest first; the prefix may include a directory"""
+    directory, prefix = os.path.split(filename_prefix)
+    checkpoints = []
+    if not os.path.isdir(directory or '.'):
+        return checkpoints
+    for name in os.listdir(directory or '.'):
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and suffix.isdigit():
+            checkpoints.append((int(suffix), os.path.join(directory, name)))
+    return sorted(checkpoints)
+
+def latest_checkpoint(filename_prefix='neat-checkpoint-'):
+    """Path of the checkpoint with the highest generation, or None"""
+    checkpoints = list_checkpoints(filename_prefix)
+    return checkpoints[-1][1] if checkpoints else None
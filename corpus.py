@@ -0,0 +1,144 @@
+import argparse
+import random
+import struct
+import numpy as np
+from engine import BoardEngine
+from settings import DIFFICULTY_SETTINGS, FIRST_CLICK_SAFE_RADIUS
+
+MAGIC = b"MSCORPUS"
+VERSION = 1
+# magic, version, rows, cols, mines, board count
+HEADER = struct.Struct("<8sHHHIQ")
+
+def record_dtype(rows, cols):
+    """One fixed-size record: the first click and the bit-packed mine mask"""
+    return np.dtype([('x', '<u2'), ('y', '<u2'), ('mask', 'u1', ((rows * cols + 7) // 8,))])
+
+class CorpusWriter:
+    """Append boards of one size to a corpus file
+
+    The file is a fixed header followed by fixed-size records, so a reader
+    can map it and index any board directly. The board count in the header
+    is written when the writer is closed.
+    """
+    def __init__(self, path, rows, cols, mines):
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.count = 0
+        self.dtype = record_dtype(rows, cols)
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, rows, cols, mines, 0))
+
+    def add(self, mine, first_x, first_y):
+        """Write one (rows, cols) mine mask with the cell clicked first"""
+        record = np.zeros(1, dtype=self.dtype)
+        record['x'], record['y'] = first_x, first_y
+        record['mask'][0] = np.packbits(np.asarray(mine, dtype=bool).ravel())
+        self.file.write(record.tobytes())
+        self.count += 1
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.mines, self.count))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Corpus:
+    """Read-only, memory-mapped view of a corpus file
+
+    Nothing is loaded up front: records are paged in by the OS when a board
+    is used, and every process mapping the same file shares those pages.
+    A Corpus pickles as its path, so workers simply map the file again.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, rows, cols, mines, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a board corpus")
+        if version != VERSION:
+            raise ValueError(f"Unsupported corpus version {version} in '{path}'")
+        self.rows, self.cols, self.mines = rows, cols, mines
+        dtype = record_dtype(rows, cols)
+        self.records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,)) \
+            if count else np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __reduce__(self):
+        return Corpus, (self.path,)
+
+    def first_click(self, index):
+        record = self.records[index]
+        return int(record['x']), int(record['y'])
+
+    def mine_mask(self, index):
+        """Unpack the (rows, cols) mine mask of one board"""
+        bits = np.unpackbits(self.records[index]['mask'], count=self.rows * self.cols)
+        return bits.astype(bool).reshape(self.rows, self.cols)
+
+    def board(self, index):
+        """A headless BoardEngine with the layout of one board"""
+        board = BoardEngine(self.rows, self.cols, self.mines, deferred=True)
+        board.set_layout(self.mine_mask(index))
+        return board
+
+    def __iter__(self):
+        """Yield (board, first click) for every board in order"""
+        for index in range(len(self)):
+            yield self.board(index), self.first_click(index)
+
+def write_corpus(path, count, rows, cols, mines, seed=0, safe_radius=FIRST_CLICK_SAFE_RADIUS,
+                 random_click=False):
+    """Generate count seeded boards and write them as a corpus
+
+    The first click is the centre cell, where play_game starts, or a random
+    cell with random_click. Mines are kept out of its safe zone.
+    """
+    rng = random.Random(seed)
+    with CorpusWriter(path, rows, cols, mines) as writer:
+        for _ in range(count):
+            if random_click:
+                x, y = rng.randrange(rows), rng.randrange(cols)
+            else:
+                x, y = rows // 2, cols // 2
+            board = BoardEngine(rows, cols, mines, rng, deferred=True)
+            board.place_mines(x, y, safe_radius)
+            writer.add(board.mine, x, y)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write or inspect board corpus files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    write = commands.add_parser("write", help="Generate a corpus of seeded boards")
+    write.add_argument("path")
+    write.add_argument("--boards", type=int, default=10000, help="Number of boards")
+    write.add_argument("--difficulty", choices=list(DIFFICULTY_SETTINGS), default="hard")
+    write.add_argument("--seed", type=int, default=0)
+    write.add_argument("--safe-radius", type=int, default=FIRST_CLICK_SAFE_RADIUS,
+                       help="Mine-free radius around the first click")
+    write.add_argument("--random-click", action="store_true", help="Random first click instead of the centre")
+    info = commands.add_parser("info", help="Describe a corpus file")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "write":
+        settings = DIFFICULTY_SETTINGS[args.difficulty]
+        write_corpus(args.path, args.boards, settings['ROWS'], settings['COLS'], settings['AMOUT_MINES'],
+                     args.seed, args.safe_radius, args.random_click)
+    corpus = Corpus(args.path)
+    print(f"{args.path}: {len(corpus)} boards of {corpus.rows}x{corpus.cols} with {corpus.mines} mines")
+
+if __name__ == "__main__":
+    main()
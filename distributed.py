@@ -0,0 +1,346 @@
+import argparse
+import ipaddress
+import multiprocessing
+import os
+import queue as queues
+import socket
+import threading
+import time
+from collections import deque
+from itertools import count
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge, wait
+import numpy as np
+import profiling
+from board_sets import BoardSet
+from genome_io import network_from_bytes
+from settings import (DISTRIBUTED_AUTHKEY, DISTRIBUTED_BATCH_SIZE, DISTRIBUTED_HOST, DISTRIBUTED_PORT,
+                      HEARTBEAT_INTERVAL, WORKER_TIMEOUT)
+
+def is_loopback(address):
+    """Whether only this machine can reach an address; Unix sockets are local"""
+    if isinstance(address, str):
+        return True
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(address[0])).is_loopback
+    except (OSError, ValueError):
+        return False
+
+def shutdown(conn):
+    """Shut a connection's socket down, which wakes any thread blocked on it"""
+    try:
+        with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+class RemoteWorker:
+    """The coordinator's view of one connected worker
+
+    Messages go out through a sender thread, so a worker that stops reading
+    never blocks the coordinator. A failed send marks the worker failed.
+    """
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.last_seen = time.monotonic()
+        self.board_key = None  # Board set the worker holds
+        self.pack_id = None    # Generation whose genomes the worker holds
+        self.genomes = set()   # Hashes of those genomes
+        self.batch = None      # (batch id, task indices) being evaluated
+        self.failed = False
+        self.outbox = queues.Queue()
+        self.sender = threading.Thread(target=self.send_messages, daemon=True)
+        self.sender.start()
+
+    def send(self, message):
+        self.outbox.put(message)
+
+    def send_messages(self):
+        while True:
+            message = self.outbox.get()
+            if message is None:
+                return
+            try:
+                self.conn.send(message)
+            except (OSError, ValueError):
+                self.failed = True
+                return
+
+    def close(self, wait=0):
+        """Stop the sender, after up to wait seconds for queued messages, and close the connection"""
+        self.outbox.put(None)
+        self.sender.join(wait)
+        # Shutting the socket down wakes a sender blocked on a full buffer
+        shutdown(self.conn)
+        self.sender.join(1)
+        self.conn.close()
+
+class Coordinator:
+    """Hand batches of genomes to workers connected over TCP or a Unix socket
+
+    Workers connect whenever they like, from this machine or others, and are
+    sent the NEAT config once. Each batch goes to an idle worker together
+    with the board set and the packed genomes it needs, if the worker does
+    not have them yet, so every genome reaches a worker at most once per
+    generation and batches name genomes by hash. Workers send a heartbeat
+    while they compute; a worker that disconnects or stays silent for longer
+    than timeout is dropped and its batch is queued again. A connection that
+    does not finish the handshake within timeout is closed.
+
+    Workers are sent pickles and may send them back, so every connection
+    must know authkey. Without one the coordinator makes a random key that
+    only its local workers receive, and it refuses to listen on anything
+    but loopback or a Unix socket.
+    """
+    def __init__(self, config, seed, address=(DISTRIBUTED_HOST, DISTRIBUTED_PORT), authkey=DISTRIBUTED_AUTHKEY,
+                 batch_size=DISTRIBUTED_BATCH_SIZE, heartbeat_interval=HEARTBEAT_INTERVAL,
+                 timeout=WORKER_TIMEOUT):
+        if authkey is None:
+            if not is_loopback(address):
+                raise ValueError(f"Listening on {address} needs an authkey shared with the workers")
+            authkey = os.urandom(32)
+        self.config = config
+        self.seed = seed
+        self.authkey = authkey
+        self.batch_size = batch_size
+        self.heartbeat_interval = heartbeat_interval
+        self.timeout = timeout
+        self.workers = []
+        self.lock = threading.Lock()
+        self.batch_ids = count()
+        self.local_workers = []
+        # Connections authenticate in their own thread, so a silent client holds up no one
+        self.listener = Listener(address)
+        self.address = self.listener.address
+        self.closed = False
+        threading.Thread(target=self.accept_workers, daemon=True).start()
+
+    def accept_workers(self):
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                continue  # The listener was closed
+            threading.Thread(target=self.handshake, args=(conn,), daemon=True).start()
+
+    def handshake(self, conn):
+        """Authenticate a new connection and send it the config, or close it after timeout"""
+        timer = threading.Timer(self.timeout, shutdown, (conn,))
+        timer.start()
+        try:
+            deliver_challenge(conn, self.authkey)
+            answer_challenge(conn, self.authkey)
+            kind, name = conn.recv()
+            conn.send(('config', self.config, self.seed, self.heartbeat_interval,
+                       profiling.timer is not None))
+        except (OSError, EOFError, ValueError, multiprocessing.AuthenticationError):
+            conn.close()
+            return
+        finally:
+            timer.cancel()
+        print(f"Worker {name} connected")
+        with self.lock:
+            self.workers.append(RemoteWorker(conn, name))
+
+    def spawn_local_workers(self, num_workers):
+        """Start worker processes on this machine that connect back to the coordinator"""
+        address = self.address
+        if isinstance(address, tuple) and address[0] in ('0.0.0.0', ''):
+            address = ('127.0.0.1', address[1])
+        for _ in range(num_workers):
+            process = multiprocessing.Process(target=run_worker, args=(address, self.authkey), daemon=True)
+            process.start()
+            self.local_workers.append(process)
+
+    def map(self, tasks, pack, board_set=None):
+        """Evaluate (genome id, genome hash, boards) tasks; return (fitness, timings) for each, in order
+
+        pack is the GenomePack holding every genome the tasks name.
+        """
+        results = [None] * len(tasks)
+        queue = deque(range(start, min(start + self.batch_size, len(tasks)))
+                      for start in range(0, len(tasks), self.batch_size))
+        remaining = len(queue)
+        waiting_since = None
+
+        while remaining:
+            with self.lock:
+                workers = list(self.workers)
+            if not workers:
+                if waiting_since is None:
+                    waiting_since = time.monotonic()
+                    print("Waiting for workers to connect...")
+                time.sleep(0.1)
+                continue
+            waiting_since = None
+
+            for worker in workers:
+                if worker.failed:
+                    self.drop(worker, queue, "unreachable")
+                elif worker.batch is None and queue:
+                    self.dispatch(worker, queue.popleft(), tasks, pack, board_set)
+
+            # Dropped workers have closed connections
+            with self.lock:
+                workers = list(self.workers)
+            for conn in wait([worker.conn for worker in workers], timeout=self.heartbeat_interval):
+                worker = next(worker for worker in workers if worker.conn is conn)
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self.drop(worker, queue, "disconnected")
+                    continue
+                worker.last_seen = time.monotonic()
+                if message[0] == 'result' and worker.batch is not None and message[1] == worker.batch[0]:
+                    for index, result in zip(worker.batch[1], message[2]):
+                        results[index] = result
+                    worker.batch = None
+                    remaining -= 1
+
+            now = time.monotonic()
+            for worker in workers:
+                if worker in self.workers and now - worker.last_seen > self.timeout:
+                    self.drop(worker, queue, f"silent for {now - worker.last_seen:.0f}s")
+        return results
+
+    def dispatch(self, worker, indices, tasks, pack, board_set):
+        """Queue one batch for a worker, and first the board set and genomes the worker lacks
+
+        The sends happen in the worker's sender thread. If the worker stops
+        reading, its heartbeats stop too and it is dropped after timeout.
+        """
+        key = board_set.key if board_set is not None else None
+        if board_set is not None and worker.board_key != key:
+            worker.send(('boards', key, board_set.specs, board_set.packed.tobytes()))
+            worker.board_key = key
+        if worker.pack_id != pack.path:
+            worker.pack_id, worker.genomes = pack.path, set()
+        missing = {tasks[index][1] for index in indices} - worker.genomes
+        if missing:
+            worker.send(('genomes', pack.path, {genome_key: pack.data(genome_key) for genome_key in missing}))
+            worker.genomes |= missing
+        batch_id = next(self.batch_ids)
+        worker.send(('batch', batch_id, key, [tasks[index] for index in indices]))
+        worker.batch = (batch_id, indices)
+        # The timeout counts from the dispatch, not from the worker's last idle heartbeat
+        worker.last_seen = time.monotonic()
+
+    def drop(self, worker, queue, reason):
+        """Forget a worker and queue its batch again"""
+        print(f"Worker {worker.name} {reason}; re-dispatching its work")
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+        if worker.batch is not None:
+            queue.append(worker.batch[1])
+            worker.batch = None
+        worker.close()
+
+    def close(self):
+        self.closed = True
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.send(('stop',))
+            worker.close(wait=1)
+        self.listener.close()
+        for process in self.local_workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.local_workers = []
+
+def run_worker(address, authkey, name=None):
+    """Connect to a coordinator and evaluate the batches it sends until told to stop"""
+    from main import cached_network, eval_network  # main imports this module
+
+    conn = Client(address, authkey=authkey)
+    send_lock = threading.Lock()
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    send(('hello', name or f"{socket.gethostname()}-{os.getpid()}"))
+    _, config, seed, heartbeat_interval, profile = conn.recv()
+    if profile:
+        profiling.enable()
+
+    # Heartbeats go out from a thread, so they continue while a batch is evaluated
+    stopped = threading.Event()
+    def heartbeat():
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send(('heartbeat',))
+            except OSError:
+                return
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    board_set = None
+    # Packed genomes of the current generation, by hash
+    pack_id, genomes = None, {}
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == 'boards':
+                _, key, specs, packed = message
+                board_set = BoardSet(specs, np.frombuffer(packed, dtype=np.uint8), key=key)
+            elif message[0] == 'genomes':
+                _, pack, data = message
+                if pack != pack_id:
+                    pack_id, genomes = pack, {}
+                genomes.update(data)
+            elif message[0] == 'batch':
+                _, batch_id, key, items = message
+                boards_used = board_set if key is not None else None
+                results = []
+                for genome_id, genome_key, boards in items:
+                    net = cached_network(genome_key, lambda: network_from_bytes(genomes[genome_key], config))
+                    fitness = eval_network(net, genome_id, seed, board_set=boards_used, boards=boards,
+                                           per_board=boards_used is not None)
+                    results.append((fitness, profiling.collect()))
+                send(('result', batch_id, results))
+            elif message[0] == 'stop':
+                break
+    except (EOFError, OSError):
+        pass  # The coordinator went away
+    finally:
+        stopped.set()
+        conn.close()
+
+def parse_address(args):
+    if args.socket:
+        return args.socket
+    return (args.host, args.port)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed NEAT training over TCP or a Unix socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, text in (("worker", "Evaluate genomes for a coordinator"),
+                          ("train", "Run training as the coordinator")):
+        sub = commands.add_parser(command, help=text)
+        sub.add_argument("--host", default=DISTRIBUTED_HOST,
+                         help="Coordinator host to connect to, or interface to listen on")
+        sub.add_argument("--port", type=int, default=DISTRIBUTED_PORT)
+        sub.add_argument("--socket", help="Unix socket path instead of TCP")
+        sub.add_argument("--authkey", default=DISTRIBUTED_AUTHKEY.decode() if DISTRIBUTED_AUTHKEY else None,
+                         help="Shared secret; needed by workers, and by a coordinator not on loopback")
+    train = commands.choices["train"]
+    train.add_argument("--config", default="neat-config.txt", help="NEAT config file")
+    train.add_argument("--local-workers", type=int, default=0, help="Worker processes to start on this machine")
+    train.add_argument("--seed", type=int, default=None, help="Base seed for the boards")
+    args = parser.parse_args(argv)
+
+    authkey = args.authkey.encode() if args.authkey else None
+    address = parse_address(args)
+    if args.command == "worker":
+        if authkey is None:
+            parser.error("a worker needs the coordinator's --authkey")
+        run_worker(address, authkey)
+    else:
+        if authkey is None and not is_loopback(address):
+            parser.error(f"listening on {args.host} needs --authkey or DISTRIBUTED_AUTHKEY")
+        import main as training
+        training.run_neat(args.config, args.local_workers, args.seed, address=address, authkey=authkey)
+
+if __name__ == "__main__":
+    main()
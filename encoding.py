@@ -0,0 +1,110 @@
+from math import isqrt
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PAD_VALUE = -2  # Input value for grid positions outside the board
+
+class BoardEncoder:
+    """Fit a board of any size to a network with a fixed square input and output grid
+
+    A network with 256 inputs and 256 outputs sees a 16x16 grid. Smaller
+    boards sit in the top-left corner with the rest of the grid padded.
+    Larger boards are covered by grid-sized windows, the last window on each
+    axis aligned to the board edge. Output (i, j) of a window scores the cell
+    under input (i, j), so every cell maps to exactly one output.
+    """
+    def __init__(self, num_inputs, num_outputs):
+        self.side = isqrt(num_inputs)
+        if self.side * self.side != num_inputs or num_outputs != num_inputs:
+            raise ValueError(f"Expected a square grid with as many outputs as inputs, "
+                             f"got {num_inputs} inputs and {num_outputs} outputs")
+
+    @staticmethod
+    def for_network(net):
+        """Encoder matching the input and output sizes of a network"""
+        sizes = network_sizes(net)
+        if sizes not in _encoders:
+            _encoders[sizes] = BoardEncoder(*sizes)
+        return _encoders[sizes]
+
+    def origins(self, size):
+        """Window start positions along an axis of the given length"""
+        if size <= self.side:
+            return [0]
+        starts = list(range(0, size - self.side, self.side))
+        return starts + [size - self.side]
+
+    def windows(self, rows, cols):
+        return [(x, y) for x in self.origins(rows) for y in self.origins(cols)]
+
+    def encode(self, state):
+        """Turn a (rows, cols) board state into a (windows, inputs) array"""
+        return self.encode_batch(state[np.newaxis])
+
+    def decode(self, outputs, rows, cols):
+        """Turn (windows, outputs) network outputs into a (rows, cols) array of cell scores"""
+        return self.decode_batch(outputs, rows, cols)[0]
+
+    def encode_batch(self, states):
+        """Turn (games, rows, cols) board states into a (games * windows, inputs) array
+
+        The windows of each game are consecutive rows.
+        """
+        games, rows, cols = states.shape
+        windows = self.windows(rows, cols)
+        grids = np.full((games, len(windows), self.side, self.side), PAD_VALUE, dtype=float)
+        for i, (x, y) in enumerate(windows):
+            crop = states[:, x:x + self.side, y:y + self.side]
+            grids[:, i, :crop.shape[1], :crop.shape[2]] = crop
+        return grids.reshape(games * len(windows), -1)
+
+    def decode_batch(self, outputs, rows, cols):
+        """Turn the outputs for encode_batch inputs into a (games, rows, cols) array of cell scores"""
+        windows = self.windows(rows, cols)
+        grids = np.asarray(outputs, dtype=float).reshape(-1, len(windows), self.side, self.side)
+        scores = np.zeros((len(grids), rows, cols))
+        for i, (x, y) in enumerate(windows):
+            width, height = min(self.side, rows - x), min(self.side, cols - y)
+            scores[:, x:x + width, y:y + height] = grids[:, i, :width, :height]
+        return scores
+
+    def scores(self, net, state):
+        """Score every cell of a board state with a network"""
+        inputs = self.encode(state)
+        if hasattr(net, 'activate_batch'):
+            outputs = net.activate_batch(inputs)
+        else:
+            outputs = [net.activate(row) for row in inputs]
+        return self.decode(outputs, *state.shape)
+
+_encoders = {}
+
+def network_sizes(net):
+    """(inputs, outputs) of a compiled or neat-python network"""
+    if hasattr(net, 'output_slots'):
+        return net.num_inputs, len(net.output_slots)
+    return len(net.input_nodes), len(net.output_nodes)
+
+def is_local_network(net):
+    """Whether a network scores one cell from a square patch around it"""
+    inputs, outputs = network_sizes(net)
+    side = isqrt(inputs)
+    return outputs == 1 and side * side == inputs and side % 2 == 1
+
+def extract_patches(state, cells, size):
+    """Return the size x size neighbourhood of each cell as a (cells, size * size) array
+
+    Positions outside the board read as PAD_VALUE.
+    """
+    radius = size // 2
+    padded = np.pad(state.astype(float), radius, constant_values=PAD_VALUE)
+    windows = sliding_window_view(padded, (size, size))
+    xs, ys = np.asarray(cells).T
+    return windows[xs, ys].reshape(len(xs), size * size)
+
+def local_scores(net, state, cells):
+    """Score the given cells with a local-window network, all in one batch"""
+    inputs = extract_patches(state, cells, isqrt(network_sizes(net)[0]))
+    if hasattr(net, 'activate_batch'):
+        return net.activate_batch(inputs)[:, 0]
+    return np.array([net.activate(row)[0] for row in inputs])
@@ -0,0 +1,294 @@
+import random
+from collections import deque
+import numpy as np
+
+def count_adjacent(mask):
+    """Count the set neighbours of every cell of a boolean mask
+
+    Works on the last two axes, so a stack of boards is handled in one call.
+    The cell itself is not counted.
+    """
+    padded = np.pad(mask.astype(np.int8), [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)])
+    rows, cols = mask.shape[-2:]
+    counts = np.zeros(mask.shape, dtype=np.int8)
+    for dx in range(3):
+        for dy in range(3):
+            if dx != 1 or dy != 1:
+                counts += padded[..., dx:dx + rows, dy:dy + cols]
+    return counts
+
+def make_rng(rng=None):
+    """A random.Random for a seed; generators pass through and None uses the global random module"""
+    if rng is None:
+        return random
+    if isinstance(rng, (int, str, bytes)):
+        return random.Random(rng)
+    return rng
+
+def sample_cells(rng, size, count, exclude=()):
+    """Draw count distinct flat indices from range(size) without the excluded ones
+
+    Sampling is done without replacement over the allowed cells only, so the
+    cost follows count rather than the density of the board.
+    """
+    exclude = sorted(set(exclude))
+    cells = rng.sample(range(size - len(exclude)), count)
+    if not exclude:
+        return cells
+    # Shift every drawn index past the excluded cells at or below it
+    result = []
+    for cell in cells:
+        for excluded in exclude:
+            if cell >= excluded:
+                cell += 1
+        result.append(cell)
+    return result
+
+class BoardEngine:
+    """Pure game logic for a Minesweeper board, usable without pygame
+
+    The board is stored as (rows, cols) numpy arrays: a mine mask, the number
+    of adjacent mines for every cell, and the revealed and flagged masks. The
+    clue counts are computed once per layout and only patched when a mine moves.
+    Running counters of safe cells left, revealed cells and flags are kept by
+    dig and the flag methods, so win checks never rescan the board.
+
+    Mines are drawn from rng, which may be a seed, a random.Random or None
+    for the global random module, so a seeded board can be rebuilt exactly.
+    A deferred board places its mines on the first dig instead, keeping the
+    clicked cell and every cell within safe_radius of it free.
+    """
+    def __init__(self, rows, cols, mines, rng=None, deferred=False, safe_radius=0):
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.rng = make_rng(rng)
+        self.mine = np.zeros((rows, cols), dtype=bool)
+        self.clues = np.zeros((rows, cols), dtype=np.int8)
+        self.revealed = np.zeros((rows, cols), dtype=bool)
+        self.flagged = np.zeros((rows, cols), dtype=bool)
+        self.deferred = deferred
+        self.safe_radius = safe_radius
+        if not deferred:
+            self.place_mines()
+            self.place_clues()
+        self.last_revealed = []  # Cells uncovered by the latest dig
+        self.changes = None  # Set to a list to record every cell revealed or flagged
+        self.first_move = True
+        self.mines_flagged = 0
+        self.revealed_cells = 0
+        self.safe_left = rows * cols - mines
+        self.exploded = None
+
+    def tile_type(self, x, y):
+        """Classic tile type: "X" for a mine, "C" for a clue and "." for an empty tile"""
+        if self.mine[x, y]:
+            return "X"
+        if self.clues[x, y] > 0:
+            return "C"
+        return "."
+
+    def place_mines(self, safe_x=None, safe_y=None, radius=0):
+        """Place mines randomly on the board
+
+        When a safe cell is given, it and every cell within radius of it stay
+        free of mines. The zone shrinks to the cell alone, and then to nothing,
+        when the board is too dense to leave it empty.
+        """
+        self.mine[:] = False
+        exclude = []
+        if safe_x is not None:
+            exclude = self.safe_zone(safe_x, safe_y, radius)
+            if self.rows * self.cols - len(exclude) < self.mines:
+                exclude = [safe_x * self.cols + safe_y]
+            if self.rows * self.cols - len(exclude) < self.mines:
+                exclude = []
+        for cell in sample_cells(self.rng, self.rows * self.cols, self.mines, exclude):
+            self.mine.flat[cell] = True
+
+    def set_layout(self, mine):
+        """Use the given (rows, cols) mine mask instead of a random layout"""
+        self.mine[:] = mine
+        self.place_clues()
+        self.deferred = False
+
+    def safe_zone(self, x, y, radius):
+        """Flat indices of the cells within radius of (x, y)"""
+        return [i * self.cols + j
+                for i in range(max(0, x - radius), min(self.rows, x + radius + 1))
+                for j in range(max(0, y - radius), min(self.cols, y + radius + 1))]
+
+    def ensure_safe_first_move(self, first_x, first_y):
+        """Ensures the first click is always safe"""
+        # A deferred board is generated around the first click
+        if self.deferred:
+            self.place_mines(first_x, first_y, self.safe_radius)
+            self.place_clues()
+            return
+
+        # If the first click is a mine, move it elsewhere
+        if self.mine[first_x, first_y]:
+            # Prefer an empty tile; on boards too dense to have one, any safe cell
+            free = ~self.mine & (self.clues == 0)
+            free[first_x, first_y] = False
+            if not free.any():
+                free = ~self.mine
+                free[first_x, first_y] = False
+            cells = np.flatnonzero(free)
+            if len(cells) == 0:
+                return  # Every cell is a mine
+            x, y = divmod(int(cells[self.rng.randrange(len(cells))]), self.cols)
+
+            # Only the clues around the two changed cells need updating
+            self.set_mine(first_x, first_y, False)
+            self.set_mine(x, y, True)
+
+    def set_mine(self, x, y, value):
+        """Add or remove a mine and update the clue counts around it"""
+        if self.mine[x, y] == value:
+            return
+        self.mine[x, y] = value
+        area = (slice(max(0, x - 1), x + 2), slice(max(0, y - 1), y + 2))
+        self.clues[area] += 1 if value else -1
+        # A cell is not its own neighbour
+        self.clues[x, y] += -1 if value else 1
+
+    def clear_clues(self):
+        """Clear all clues from the board for recalculation"""
+        self.clues[:] = 0
+
+    def place_clues(self):
+        """Place number clues based on mine positions"""
+        self.clues = count_adjacent(self.mine)
+
+    def is_inside(self, x, y):
+        """Check if a position is inside the board"""
+        return 0 <= x < self.rows and 0 <= y < self.cols
+
+    def check_neighbours(self, x, y):
+        """Count the number of adjacent mines"""
+        return int(self.clues[x, y])
+
+    def reveal_all_mines(self, exploded_x=None, exploded_y=None):
+        """Reveal all mines on the board. Mark the exploded one if provided."""
+        self.revealed_cells += int(np.count_nonzero(self.mine & ~self.revealed))
+        self.revealed |= self.mine
+        if exploded_x is not None and exploded_y is not None:
+            self.exploded = (exploded_x, exploded_y)
+
+    def dig(self, x, y):
+        """Dig at the specified position"""
+        # Ensure first move is always safe
+        if self.first_move:
+            self.ensure_safe_first_move(x, y)
+            self.first_move = False
+        self.last_revealed = []
+
+        # If flagged, don't dig
+        if self.flagged[x, y]:
+            return True
+
+        # Already revealed, no need to dig again
+        if self.revealed[x, y]:
+            return True
+
+        # Hit a mine
+        if self.mine[x, y]:
+            self.last_revealed = [(x, y)]
+            self.reveal_all_mines(x, y)
+            return False
+
+        # Hit a number or an empty tile, which expands to the adjacent tiles
+        self.last_revealed = self.flood_fill(x, y)
+        return True
+
+    def flood_fill(self, x, y):
+        """Reveal a safe tile and the empty region around it; return the newly revealed cells"""
+        # The revealed mask doubles as the visited set, so each cell is queued once
+        self.revealed[x, y] = True
+        newly_revealed = []
+        queue = deque([(x, y)])
+        while queue:
+            cx, cy = queue.popleft()
+            newly_revealed.append((cx, cy))
+            if self.clues[cx, cy] > 0:
+                continue
+            for nx in range(max(0, cx - 1), min(self.rows, cx + 2)):
+                for ny in range(max(0, cy - 1), min(self.cols, cy + 2)):
+                    if not self.revealed[nx, ny] and not self.flagged[nx, ny]:
+                        self.revealed[nx, ny] = True
+                        queue.append((nx, ny))
+        self.revealed_cells += len(newly_revealed)
+        self.safe_left -= len(newly_revealed)
+        if self.changes is not None:
+            self.changes.extend(newly_revealed)
+        return newly_revealed
+
+    def set_revealed(self, x, y, value=True):
+        """Reveal or hide a single tile without expanding it"""
+        if self.revealed[x, y] == value:
+            return
+        self.revealed[x, y] = value
+        step = 1 if value else -1
+        self.revealed_cells += step
+        if not self.mine[x, y]:
+            self.safe_left -= step
+        if self.changes is not None:
+            self.changes.append((x, y))
+
+    def set_flag(self, x, y, value=True):
+        """Place or remove a flag"""
+        if self.flagged[x, y] == value:
+            return
+        self.flagged[x, y] = value
+        self.mines_flagged += 1 if value else -1
+        if self.changes is not None:
+            self.changes.append((x, y))
+
+    def toggle_flag(self, x, y):
+        """Flip the flag on an unrevealed tile"""
+        if not self.revealed[x, y]:
+            self.set_flag(x, y, not self.flagged[x, y])
+
+    def check_win(self):
+        """Check whether every safe tile has been revealed"""
+        return self.safe_left == 0
+
+    def revealed_count(self):
+        """Number of revealed tiles"""
+        return self.revealed_cells
+
+    def get_state(self):
+        """
+        Get the current state of the board for the AI.
+        Returns a 2D numpy array where:
+        -1 = Unrevealed tile
+        0-8 = Revealed tile with number of adjacent mines
+        9 = Revealed mine
+        10 = Flagged tile
+        """
+        hidden = np.where(self.flagged, 10, -1)
+        shown = np.where(self.mine, 9, self.clues)
+        return np.where(self.revealed, shown, hidden)
+
+    def get_flat_state(self):
+        """Get a flattened representation of the board state for neural networks"""
+        return self.get_state().ravel()
+
+    def display_board(self):
+        """Print a text representation of the board to the console (for debugging)"""
+        for y in range(self.cols):
+            row_str = ""
+            for x in range(self.rows):
+                if self.revealed[x, y]:
+                    if self.mine[x, y]:
+                        row_str += "X "
+                    elif self.clues[x, y] > 0:
+                        row_str += str(self.clues[x, y]) + " "
+                    else:
+                        row_str += ". "
+                elif self.flagged[x, y]:
+                    row_str += "F "
+                else:
+                    row_str += "? "
+            print(row_str)
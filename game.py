@@ -3,6 +3,7 @@ import os
 import time
 from sprites import Board
 from settings import *
+from assets import tile_not_mine
 
 class Game:
     def __init__(self):
@@ -93,7 +94,8 @@ class Game:
 
     def new(self):
         settings = DIFFICULTY_SETTINGS[self.difficulty]
-        self.board = Board(settings['ROWS'], settings['COLS'], settings['AMOUT_MINES'])
+        self.board = Board(settings['ROWS'], settings['COLS'], settings['AMOUT_MINES'],
+                           deferred=True, safe_radius=FIRST_CLICK_SAFE_RADIUS)
         self.game_started = False
         self.game_over = False
         self.win = False
@@ -136,11 +138,7 @@ class Game:
         pygame.display.flip()
 
     def check_win(self):
-        for row in self.board.board_list:
-            for tile in row:
-                if tile.type != "X" and not tile.revealed:
-                    return False
-        return True
+        return self.board.check_win()
 
     def events(self):
         for event in pygame.event.get():
@@ -183,8 +181,7 @@ class Game:
                                 self.game_over = True
                                 
                     if event.button == 3:  # Right click
-                        if not self.board.board_list[mx][my].revealed:
-                            self.board.board_list[mx][my].flagged = not self.board.board_list[mx][my].flagged
+                        self.board.toggle_flag(mx, my)
                     
                     # Check win condition after each move
                     if self.check_win():
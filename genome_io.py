@@ -0,0 +1,215 @@
+import json
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from itertools import count
+import numpy as np
+import neat
+from neat.genes import DefaultConnectionGene, DefaultNodeGene
+from network import CompiledNetwork, create_network
+from settings import GENOME_FILE, LEGACY_GENOME_FILE, POPULATION_SUFFIX
+
+MAGIC = b"MSGENOME"
+VERSION = 1
+COMPRESSED = 1  # Header flag: the body is zlib-compressed
+# magic, version, flags, generation (-1 for a lone genome), genome count
+HEADER = struct.Struct("<8sHHqI")
+# key, fitness (NaN when unset), node count, connection count
+GENOME = struct.Struct("<qdII")
+NODE = np.dtype([('key', '<i8'), ('bias', '<f8'), ('response', '<f8'),
+                 ('activation', '<u2'), ('aggregation', '<u2')])
+CONNECTION = np.dtype([('input', '<i8'), ('output', '<i8'), ('weight', '<f8'), ('enabled', 'u1')])
+
+def genomes_to_bytes(genomes, generation=-1, compress=True):
+    """Pack genomes into the binary format
+
+    Every genome is a small fixed header followed by its node and connection
+    tables as packed arrays. Activation and aggregation names are stored
+    once, in a JSON table at the start of the body.
+    """
+    names = sorted({name for genome in genomes for node in genome.nodes.values()
+                    for name in (node.activation, node.aggregation)})
+    index = {name: i for i, name in enumerate(names)}
+    table = json.dumps(names).encode()
+    parts = [struct.pack("<I", len(table)), table]
+    for genome in genomes:
+        nodes = np.array([(node.key, node.bias, node.response, index[node.activation], index[node.aggregation])
+                          for node in genome.nodes.values()], dtype=NODE)
+        connections = np.array([(cg.key[0], cg.key[1], cg.weight, cg.enabled)
+                                for cg in genome.connections.values()], dtype=CONNECTION)
+        fitness = float('nan') if genome.fitness is None else genome.fitness
+        parts += [GENOME.pack(genome.key, fitness, len(nodes), len(connections)),
+                  nodes.tobytes(), connections.tobytes()]
+    body = b"".join(parts)
+    if compress:
+        body = zlib.compress(body)
+    return HEADER.pack(MAGIC, VERSION, COMPRESSED if compress else 0, generation, len(genomes)) + body
+
+def unpack_records(data):
+    """Unpack the binary format into (records, generation, names)
+
+    Every record is (key, fitness, nodes, connections), with the node and
+    connection tables as structured arrays indexing into names.
+    """
+    magic, version, flags, generation, num_genomes = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a genome file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported genome file version {version}")
+    body = data[HEADER.size:]
+    if flags & COMPRESSED:
+        body = zlib.decompress(body)
+
+    (table_size,) = struct.unpack_from("<I", body)
+    offset = 4 + table_size
+    names = json.loads(body[4:offset])
+    records = []
+    for _ in range(num_genomes):
+        key, fitness, num_nodes, num_connections = GENOME.unpack_from(body, offset)
+        offset += GENOME.size
+        nodes = np.frombuffer(body, NODE, num_nodes, offset)
+        offset += nodes.nbytes
+        connections = np.frombuffer(body, CONNECTION, num_connections, offset)
+        offset += connections.nbytes
+        records.append((key, fitness, nodes, connections))
+    return records, generation, names
+
+def genomes_from_bytes(data, genome_type=neat.DefaultGenome):
+    """Unpack the binary format; return (genomes, generation)"""
+    records, generation, names = unpack_records(data)
+    genomes = []
+    for key, fitness, nodes, connections in records:
+        genome = genome_type(int(key))
+        genome.fitness = None if fitness != fitness else fitness
+        for node_key, bias, response, activation, aggregation in nodes.tolist():
+            node = DefaultNodeGene(node_key)
+            node.bias, node.response = bias, response
+            node.activation, node.aggregation = names[activation], names[aggregation]
+            genome.nodes[node_key] = node
+        for source, target, weight, enabled in connections.tolist():
+            connection = DefaultConnectionGene((source, target))
+            connection.weight, connection.enabled = weight, bool(enabled)
+            genome.connections[(source, target)] = connection
+        genomes.append(genome)
+    return genomes, generation
+
+def network_from_bytes(data, config):
+    """Compile the first genome of packed bytes without building its gene objects
+
+    Genomes the compiled network cannot run fall back to create_network.
+    """
+    records, _, names = unpack_records(data)
+    _, _, nodes, connections = records[0]
+    genes = {key: (bias, response, names[activation], names[aggregation])
+             for key, bias, response, activation, aggregation in nodes.tolist()}
+    enabled = connections[connections['enabled'] != 0]
+    try:
+        return CompiledNetwork.from_arrays(config, genes, enabled['input'], enabled['output'], enabled['weight'])
+    except ValueError:
+        genomes, _ = genomes_from_bytes(data, config.genome_type)
+        return create_network(genomes[0], config)
+
+def is_genome_file(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def write_atomic(path, data):
+    """Write to a temporary file and rename it, so readers never see half a file"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+def save_genome(genome, path=GENOME_FILE, compress=True):
+    write_atomic(path, genomes_to_bytes([genome], compress=compress))
+
+def load_genome(path=GENOME_FILE, genome_type=neat.DefaultGenome):
+    """Load a genome saved by save_genome, or a genome pickled by older versions"""
+    if not is_genome_file(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    with open(path, "rb") as f:
+        genomes, _ = genomes_from_bytes(f.read(), genome_type)
+    return genomes[0]
+
+def load_network(path, config):
+    """Load a saved genome straight into its inference network"""
+    return create_network(load_genome(path, config.genome_type), config)
+
+def save_population(population, path, compress=True):
+    """Save the genomes and generation number of a neat.Population"""
+    write_atomic(path, genomes_to_bytes(list(population.population.values()),
+                                        population.generation, compress))
+
+def population_file(genome_file):
+    """Where a run saving its best genome to genome_file saves its population
+
+    best_genome.bin goes with best_genome-population.bin, so runs with
+    different configs and genome files never overwrite each other's.
+    """
+    return os.path.splitext(genome_file)[0] + POPULATION_SUFFIX
+
+def load_population(path, config):
+    """Rebuild a neat.Population from a saved population
+
+    Species are formed again from the genomes, and new genome keys continue
+    after the largest saved one.
+    """
+    with open(path, "rb") as f:
+        genomes, generation = genomes_from_bytes(f.read(), config.genome_type)
+    genomes = {genome.key: genome for genome in genomes}
+    species = config.species_set_type(config.species_set_config, neat.reporting.ReporterSet())
+    species.speciate(config, genomes, generation)
+    population = neat.Population(config, (genomes, species, generation))
+    species.reporters = population.reporters
+    population.reproduction.genome_indexer = count(max(genomes) + 1)
+    return population
+
+class GenomePack:
+    """One generation's genomes, written once to a file that worker processes read
+
+    genomes maps genome_hash to genome. Every genome is stored as its own
+    uncompressed record, so a task names a genome by its location instead of
+    carrying it, and a worker that has already compiled that genome reads
+    nothing. The file lives in the temporary directory and is deleted on close.
+    """
+    def __init__(self, genomes, directory=None):
+        fd, self.path = tempfile.mkstemp(prefix="genomes-", suffix=".bin", dir=directory)
+        self.index = {}
+        offset = 0
+        with os.fdopen(fd, "wb") as f:
+            for key, genome in genomes.items():
+                data = genomes_to_bytes([genome], compress=False)
+                f.write(data)
+                self.index[key] = (offset, len(data))
+                offset += len(data)
+
+    def location(self, key):
+        """(path, offset, size) of a genome's record"""
+        return (self.path,) + self.index[key]
+
+    def data(self, key):
+        return read_record(self.location(key))
+
+    def close(self):
+        if self.path is not None:
+            os.remove(self.path)
+            self.path = None
+
+def read_record(location):
+    path, offset, size = location
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+def read_network(location, config):
+    """Compile one genome from a GenomePack record"""
+    return network_from_bytes(read_record(location), config)
+
+def find_genome_file():
+    """The saved best genome, preferring the binary file over a legacy pickle"""
+    if not os.path.exists(GENOME_FILE) and os.path.exists(LEGACY_GENOME_FILE):
+        return LEGACY_GENOME_FILE
+    return GENOME_FILE
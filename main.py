@@ -1,22 +1,52 @@
-import pygame
 import numpy as np
 import neat
 import os
-import pickle
 import time
 import random
-from sprites import Board
+import math
+import multiprocessing
+import profiling
+from engine import BoardEngine, count_adjacent, make_rng
+from solver import LogicSolver
+from probability import ProbabilityEngine
+from board_sets import BoardSet, BoardSetSchedule
+from checkpoints import AsyncCheckpointer, checkpoint_prefix, latest_checkpoint
+from distributed import Coordinator
+from genome_io import (GenomePack, find_genome_file, is_genome_file, load_genome, load_network,
+                       load_population, population_file, read_network, save_genome, save_population)
+from net_cache import LRUCache, NetworkCache, genome_hash
+from encoding import BoardEncoder, is_local_network, local_scores
 from settings import *
 
+# pygame and the tile images are only loaded when a game is visualized, so
+# training and benchmarking run on display-less machines
+pygame = None
+
+def load_pygame():
+    """Import pygame on first use"""
+    global pygame
+    if pygame is None:
+        import pygame as pygame_module
+        pygame = pygame_module
+    return pygame
+
 class MinesweeperAI:
-    def __init__(self, rows=5, cols=5, num_mines=3, visualize=False):
+    def __init__(self, rows=5, cols=5, num_mines=3, visualize=False, use_probabilities=False, rng=None):
         self.rows = rows
         self.cols = cols
         self.num_mines = num_mines
-        self.board = Board(rows, cols, num_mines)
         self.visualize = visualize
+        # Every board of this player draws its mines from one generator
+        self.rng = make_rng(rng)
+        # Exact mine probabilities narrow down the guesses left to the network
+        self.probability_engine = ProbabilityEngine(PROBABILITY_TIMEOUT) if use_probabilities else None
+        self.board = self.new_board()
+        self.solver = LogicSolver(self.board)
+        self.guesses = 0  # Network moves in the current game, certainly safe cells excluded
+        self.moves = 0    # Digs and flags in the current game, logic included
         
         if visualize:
+            load_pygame()
             pygame.init()
             self.screen_width = TILESIZE * cols
             self.screen_height = TILESIZE * rows
@@ -24,111 +54,62 @@ class MinesweeperAI:
             pygame.display.set_caption("Minesweeper AI")
             self.clock = pygame.time.Clock()
 
+    def new_board(self):
+        """Create a board, with tile images only when the game is drawn"""
+        if self.visualize:
+            from sprites import Board
+            return Board(self.rows, self.cols, self.num_mines, self.rng,
+                         deferred=True, safe_radius=FIRST_CLICK_SAFE_RADIUS)
+        # Mines are placed by the first dig, so no layout is built and then patched
+        return BoardEngine(self.rows, self.cols, self.num_mines, self.rng,
+                           deferred=True, safe_radius=FIRST_CLICK_SAFE_RADIUS)
+
     def get_state(self):
         """Get a flattened representation of the board state for the neural network"""
-        state = []
-        for x in range(self.rows):
-            for y in range(self.cols):
-                tile = self.board.board_list[x][y]
-                if tile.revealed:
-                    if tile.type == "C":
-                        state.append(self.board.check_neighbours(x, y))
-                    elif tile.type == "X":
-                        state.append(9)  # Mine
-                    else:
-                        state.append(0)  # Empty revealed tile
-                elif tile.flagged:
-                    state.append(10)     # Flagged tile
-                else:
-                    state.append(-1)     # Unrevealed tile
-        return np.array(state)
+        return self.board.get_flat_state()
 
     def make_move(self, net):
-        state = self.get_state()
-        output = net.activate(state)
+        """Choose the next cell to dig; return ((x, y), guessed), or (None, False) when none is left
+
+        guessed is False when the probability engine proved the cell safe.
+        """
+        valid_moves = ~(self.board.revealed | self.board.flagged).ravel()
+        if not valid_moves.any():
+            return None, False
 
-        valid_moves = []
-        for x in range(self.rows):
-            for y in range(self.cols):
-                if not self.board.board_list[x][y].revealed and not self.board.board_list[x][y].flagged:
-                    valid_moves.append((x, y))
+        if self.probability_engine is not None:
+            with profiling.phase('probability'):
+                probabilities = self.probability_engine.compute(self.board).ravel()
+            safest = probabilities[valid_moves].min()
+            # A cell that is certainly safe needs no guess at all
+            if safest == 0:
+                return divmod(int(np.flatnonzero(valid_moves & (probabilities == 0))[0]), self.cols), False
+            # Otherwise the network only chooses among the least risky cells
+            valid_moves &= probabilities <= safest + PROBABILITY_MARGIN
 
-        if not valid_moves:
-            return None
+        with profiling.phase('activation'):
+            state = self.board.get_state()
+            if is_local_network(net):
+                # A local-window network scores each frontier cell from the patch around it
+                candidates = valid_moves & self.frontier()
+                if not candidates.any():
+                    candidates = valid_moves
+                cells = np.flatnonzero(candidates)
+                scores = np.full(self.rows * self.cols, -np.inf)
+                scores[cells] = local_scores(net, state, np.column_stack(np.divmod(cells, self.cols)))
+            else:
+                # Pad or window the board to the network's input size and map the outputs back
+                encoder = BoardEncoder.for_network(net)
+                scores = encoder.scores(net, state).ravel()
 
         # Find the best move based on neural network output
-        best_move = None
-        best_score = -float('inf')
-        for x, y in valid_moves:
-            move_index = x * self.cols + y
-            if output[move_index] > best_score:
-                best_score = output[move_index]
-                best_move = (x, y)
-
-        return best_move
-
-    def flag_obvious_mines(self):
-        """Flag tiles that are obviously mines based on revealed numbers"""
-        flagged = False
-        for x in range(self.rows):
-            for y in range(self.cols):
-                tile = self.board.board_list[x][y]
-                if tile.revealed and tile.type == "C":
-                    # Count surrounding unrevealed and flagged tiles
-                    adjacent_number = self.board.check_neighbours(x, y)
-                    unrevealed = []
-                    flagged_count = 0
-                    
-                    for dx in range(-1, 2):
-                        for dy in range(-1, 2):
-                            nx, ny = x + dx, y + dy
-                            if self.board.is_inside(nx, ny):
-                                neighbor = self.board.board_list[nx][ny]
-                                if not neighbor.revealed:
-                                    if neighbor.flagged:
-                                        flagged_count += 1
-                                    else:
-                                        unrevealed.append((nx, ny))
-                    
-                    # If the number of adjacent unrevealed tiles equals the number, they must all be mines
-                    if adjacent_number - flagged_count == len(unrevealed) and len(unrevealed) > 0:
-                        for ux, uy in unrevealed:
-                            self.board.board_list[ux][uy].flagged = True
-                            flagged = True
-        
-        return flagged
-
-    def dig_safe_tiles(self):
-        """Dig tiles that are obviously safe based on revealed numbers and flags"""
-        dug = False
-        for x in range(self.rows):
-            for y in range(self.cols):
-                tile = self.board.board_list[x][y]
-                if tile.revealed and tile.type == "C":
-                    # Count surrounding flags and unrevealed tiles
-                    adjacent_number = self.board.check_neighbours(x, y)
-                    unrevealed = []
-                    flagged_count = 0
-                    
-                    for dx in range(-1, 2):
-                        for dy in range(-1, 2):
-                            nx, ny = x + dx, y + dy
-                            if self.board.is_inside(nx, ny):
-                                neighbor = self.board.board_list[nx][ny]
-                                if not neighbor.revealed:
-                                    if neighbor.flagged:
-                                        flagged_count += 1
-                                    else:
-                                        unrevealed.append((nx, ny))
-                    
-                    # If the number of adjacent flags equals the number, all other unrevealed are safe
-                    if adjacent_number == flagged_count and len(unrevealed) > 0:
-                        for ux, uy in unrevealed:
-                            if self.board.dig(ux, uy) == False:
-                                return False, True  # Hit a mine
-                            dug = True
-        
-        return dug, False
+        scores = np.where(valid_moves, scores, -np.inf)
+        move_index = int(np.argmax(scores))
+        return divmod(move_index, self.cols), True
+
+    def frontier(self):
+        """Flat mask of the hidden cells next to a revealed tile"""
+        return (count_adjacent(self.board.revealed) > 0).ravel() & ~self.board.revealed.ravel()
 
     def use_logic_first(self):
         """Use deterministic logic before using the neural network"""
@@ -137,14 +118,12 @@ class MinesweeperAI:
         made_progress = True
         
         while made_progress and not hit_mine:
-            # Try to flag obvious mines
-            flagged = self.flag_obvious_mines()
-            
-            # Try to dig safe tiles
-            dug, hit_mine = self.dig_safe_tiles()
-            
-            # If we didn't make progress with either method, break the loop
-            made_progress = flagged or dug
+            # Flag obvious mines and dig safe tiles around the clues that changed
+            made_progress, hit_mine = self.solver.step()
+
+            # Single clues are stuck, so reason over pairs of overlapping clues
+            if not made_progress and not hit_mine:
+                made_progress, hit_mine = self.solver.pair_step()
             
             if self.visualize:
                 self.draw()
@@ -154,16 +133,21 @@ class MinesweeperAI:
         
         return not hit_mine
 
-    def play_game(self, net):
-        self.board = Board(self.rows, self.cols, self.num_mines)
+    def play_game(self, net, board=None, first_click=None):
+        """Play one game, on the given board or a new random one, and return its fitness"""
+        with profiling.phase('board'):
+            self.board = board if board is not None else self.new_board()
+        self.solver = LogicSolver(self.board)
+        self.guesses = 0
+        self.moves = 1
         fitness = 0
         safe_tiles_revealed = 0
         total_safe_tiles = self.rows * self.cols - self.num_mines
         game_over = False
         
         try:
-            # Make first move in the center (usually safer)
-            center_x, center_y = self.rows // 2, self.cols // 2
+            # Make first move in the center (usually safer) unless told otherwise
+            center_x, center_y = first_click or (self.rows // 2, self.cols // 2)
             if not self.board.dig(center_x, center_y):
                 fitness -= 10
                 if self.visualize:
@@ -182,7 +166,9 @@ class MinesweeperAI:
                     self.handle_events()
                 
                 # First try to use deterministic logic
-                if not self.use_logic_first():
+                with profiling.phase('logic'):
+                    logic_ok = self.use_logic_first()
+                if not logic_ok:
                     fitness -= 10
                     game_over = True
                     break
@@ -194,11 +180,14 @@ class MinesweeperAI:
                     break
                 
                 # If deterministic logic can't help, use neural network
-                move = self.make_move(net)
+                move, guessed = self.make_move(net)
                 if move is None:
                     break
                 
                 x, y = move
+                if guessed:
+                    self.guesses += 1
+                self.moves += 1
                 if self.visualize:
                     print(f"AI move: ({x}, {y})")
                 
@@ -210,11 +199,7 @@ class MinesweeperAI:
                     fitness += 1 + (safe_tiles_revealed / total_safe_tiles) * 0.5
                     
                     # Extra reward for uncovering more cells at once
-                    revealed_count = 0
-                    for row in self.board.board_list:
-                        for tile in row:
-                            if tile.revealed:
-                                revealed_count += 1
+                    revealed_count = self.board.revealed_count()
                     
                     if revealed_count > safe_tiles_revealed:
                         fitness += (revealed_count - safe_tiles_revealed) * 0.2
@@ -237,11 +222,16 @@ class MinesweeperAI:
             return -20  # Return a negative fitness for failed games
 
     def check_win(self):
-        for row in self.board.board_list:
-            for tile in row:
-                if tile.type != "X" and not tile.revealed:
-                    return False
-        return True
+        return self.board.check_win()
+
+    def game_stats(self):
+        """Summary of the last game played"""
+        return {
+            'won': self.check_win(),
+            'safe_revealed': self.rows * self.cols - self.num_mines - self.board.safe_left,
+            'guesses': self.guesses,
+            'moves': self.moves + self.solver.moves,
+        }
     
     def handle_events(self):
         for event in pygame.event.get():
@@ -259,10 +249,7 @@ class MinesweeperAI:
     
     def draw_game_over(self, win):
         # Reveal all mines
-        for row in self.board.board_list:
-            for tile in row:
-                if tile.type == "X":
-                    tile.revealed = True
+        self.board.reveal_all_mines()
         
         self.draw()
         font = pygame.font.SysFont('Arial', 30)
@@ -275,28 +262,304 @@ class MinesweeperAI:
         pygame.draw.rect(self.screen, DARKGRAY, text_rect.inflate(20, 10))
         self.screen.blit(text, text_rect)
 
+# Compiled networks of this process, shared by every evaluation it runs
+network_cache = NetworkCache(NETWORK_CACHE_SIZE)
+
+def eval_genome(genome, config, seed=None, num_games=3, board_set=None, boards=None, key=None,
+                per_board=False):
+    """Play several games with a single genome and return its average fitness
+
+    With a board set the genome plays the boards of the set instead of
+    num_games random ones: all of them, or the indices given in boards.
+    per_board returns the list of their fitnesses instead of the mean.
+    key is the genome's genome_hash, when the caller already computed it.
+    """
+    with profiling.phase('network'):
+        net = network_cache.network(genome, config, key)
+    return eval_network(net, genome.key, seed, num_games, board_set, boards, per_board)
+
+def eval_network(net, genome_key, seed=None, num_games=3, board_set=None, boards=None, per_board=False):
+    """The games of eval_genome, played with the genome's compiled network"""
+    # A generator per genome makes an evaluation reproducible in any worker
+    # without touching the global random state
+    rng = make_rng(seed + genome_key if seed is not None else None)
+
+    if board_set is not None:
+        boards = boards if boards is not None else range(len(board_set))
+        fitnesses = []
+        for index in boards:
+            with profiling.phase('board'):
+                board = board_set.board(index)
+            ai = MinesweeperAI(rows=board.rows, cols=board.cols, num_mines=board.mines)
+            fitnesses.append(ai.play_game(net, board))
+        return fitnesses if per_board else sum(fitnesses) / len(fitnesses)
+
+    # Run multiple games to get a better evaluation
+    total_fitness = 0
+    for _ in range(num_games):
+        # Train on all difficulties
+        difficulty = rng.choice(['easy', 'medium', 'hard'])
+        settings = DIFFICULTY_SETTINGS[difficulty]
+        rows, cols, mines = settings['ROWS'], settings['COLS'], settings['AMOUT_MINES']
+
+        ai = MinesweeperAI(rows=rows, cols=cols, num_mines=mines, rng=rng)
+        fitness = ai.play_game(net)
+        total_fitness += fitness
+
+    return total_fitness / num_games
+
 def eval_genomes(genomes, config):
     for genome_id, genome in genomes:
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        
-        # Run multiple games to get a better evaluation
-        total_fitness = 0
-        num_games = 3
-        
-        for _ in range(num_games):
-            # Train on all difficulties
-            difficulty = random.choice(['easy', 'medium', 'hard'])
-            settings = DIFFICULTY_SETTINGS[difficulty]
-            rows, cols, mines = settings['ROWS'], settings['COLS'], settings['AMOUT_MINES']
-            
-            ai = MinesweeperAI(rows=rows, cols=cols, num_mines=mines)
-            fitness = ai.play_game(net)
-            total_fitness += fitness
-        
-        genome.fitness = total_fitness / num_games
+        genome.fitness = eval_genome(genome, config)
         print(f"Genome {genome_id} Avg Fitness: {genome.fitness:.2f}")
 
-def run_neat(config_file):
+# Per-process state of the worker pool, set once by _init_worker
+_worker_config = None
+_worker_seed = None
+_worker_board_set = None
+
+def _init_worker(config, seed, profile=False):
+    global _worker_config, _worker_seed
+    _worker_config = config
+    _worker_seed = seed
+    if profile:
+        profiling.enable()
+
+def _attach_board_set(descriptor):
+    """Open the shared board set of the current generation, once per worker"""
+    global _worker_board_set
+    if descriptor is None:
+        return None
+    if _worker_board_set is None or _worker_board_set.shm.name != descriptor[0]:
+        if _worker_board_set is not None:
+            _worker_board_set.close()
+        _worker_board_set = BoardSet.attach(descriptor)
+    return _worker_board_set
+
+def cached_network(key, build):
+    """The compiled network of a genome hash, built by build() only on a cache miss"""
+    with profiling.phase('network'):
+        net = network_cache.get(key)
+        if net is None:
+            net = build()
+            network_cache.put(key, net)
+    return net
+
+def _eval_genome_worker(task):
+    # The genome itself is read from the generation's pack only if this worker has not compiled it
+    genome_id, key, location, descriptor, boards = task
+    net = cached_network(key, lambda: read_network(location, _worker_config))
+    fitness = eval_network(net, genome_id, _worker_seed, board_set=_attach_board_set(descriptor),
+                           boards=boards, per_board=descriptor is not None)
+    # Phase timings travel back with the fitness and are merged by the evaluator
+    return fitness, profiling.collect()
+
+class GenomeEvaluator:
+    """Evaluate a generation of genomes, optionally spread across worker processes
+
+    With board_set_size > 0, all genomes of a generation play the same
+    seeded boards, generated once and shared with the workers through
+    shared memory. rotate_boards draws a new set every generation.
+
+    With racing_boards > board_set_size the best genomes are raced: every
+    genome plays board_set_size boards, then each round the top
+    1 / racing_eta play racing_eta times as many, up to racing_boards.
+    Contenders are ranked on more games while the rest of the generation
+    costs no more than without racing; see race_fitness for how the
+    rounds share one scale. Racing is off by default.
+
+    Every genome is hashed once per generation (genome_hash) and the hash
+    keys both the compiled networks and, when rotate_boards is off, a cache
+    of the results on the fixed board set, where every game is
+    deterministic. Rotating sets never repeat, so they are not cached.
+
+    With an address the evaluator coordinates workers that connect over the
+    network instead of running a local pool; num_workers of them are started
+    on this machine.
+    """
+    def __init__(self, config, num_workers=1, seed=None, board_set_size=BOARD_SET_SIZE,
+                 rotate_boards=BOARD_SET_ROTATE, fitness_cache_size=FITNESS_CACHE_SIZE,
+                 racing_boards=RACING_BOARDS, racing_eta=RACING_ETA,
+                 address=None, authkey=DISTRIBUTED_AUTHKEY):
+        self.num_workers = max(1, num_workers or 1)
+        # Always pick a base seed so every genome plays reproducible boards
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+        self.pool = None
+        # The set holds the boards of the longest race; everyone plays the first board_set_size
+        self.board_set_size = board_set_size
+        self.boards = None
+        if board_set_size:
+            self.boards = BoardSetSchedule(max(board_set_size, racing_boards), self.seed, rotate_boards)
+        self.fitness_cache = None
+        if fitness_cache_size and self.boards is not None and not rotate_boards:
+            self.fitness_cache = LRUCache(fitness_cache_size)
+        self.racing_boards = racing_boards
+        self.racing_eta = racing_eta
+        self.coordinator = None
+        self.pack = None  # GenomePack of the generation being evaluated
+
+        if address is not None:
+            self.coordinator = Coordinator(config, self.seed, address, authkey)
+            self.coordinator.spawn_local_workers(num_workers or 0)
+        elif self.num_workers > 1:
+            self.pool = multiprocessing.Pool(self.num_workers, initializer=_init_worker,
+                                             initargs=(config, self.seed, profiling.timer is not None))
+
+    def evaluate(self, genomes, config):
+        with profiling.phase('network'):
+            keys = {genome_id: genome_hash(genome) for genome_id, genome in genomes}
+            # Workers get each genome of the generation from one file, and only
+            # when they have not compiled it yet; tasks just name it
+            if self.pool is not None or self.coordinator is not None:
+                self.pack = GenomePack({keys[genome_id]: genome for genome_id, genome in genomes})
+        try:
+            self.score(genomes, keys, config)
+        finally:
+            if self.pack is not None:
+                self.pack.close()
+                self.pack = None
+        self.report(genomes)
+
+    def score(self, genomes, keys, config):
+        """Set the fitness of every genome"""
+        if self.boards is None:
+            # Random boards for every genome: no shared games to race on
+            fitnesses = self.play(genomes, keys, config, None, [None] * len(genomes))
+            for (genome_id, genome), fitness in zip(genomes, fitnesses):
+                genome.fitness = fitness
+            return
+
+        board_set = self.boards.next_set()
+        # Fitness on each board played so far, per genome
+        scores = {genome_id: self.cached_score(keys[genome_id], board_set) for genome_id, _ in genomes}
+        racing = [genome_id for genome_id, _ in genomes]
+        # (genomes, boards played) of every round
+        rounds = []
+        for target in self.race_targets(len(board_set)):
+            if rounds:
+                racing = self.race_cut(racing, scores, rounds)
+            still_racing = set(racing)
+            work = [(genome_id, genome) for genome_id, genome in genomes
+                    if genome_id in still_racing and len(scores[genome_id]) < target]
+            # Later rounds only name the boards not played yet
+            boards = [range(len(scores[genome_id]), target) for genome_id, _ in work]
+            for (genome_id, _), fitnesses in zip(work, self.play(work, keys, config, board_set, boards)):
+                scores[genome_id] = scores[genome_id] + list(fitnesses)
+            rounds.append((racing, target))
+
+        fitness = self.race_fitness(rounds, scores)
+        for genome_id, genome in genomes:
+            genome.fitness = fitness[genome_id]
+            if self.fitness_cache is not None:
+                self.fitness_cache.put((keys[genome_id], board_set.key), scores[genome_id])
+
+    def race_cut(self, racing, scores, rounds):
+        """The top 1 / racing_eta of the racing genomes, by fitness after the rounds so far"""
+        fitness = self.race_fitness(rounds, scores)
+        ranked = sorted(racing, key=lambda genome_id: -fitness[genome_id])
+        return ranked[:math.ceil(len(racing) / self.racing_eta)]
+
+    def race_fitness(self, rounds, scores):
+        """Fitness of every genome, all on the scale of a mean over the first round's boards
+
+        A genome scores its mean over the boards of the last round it raced
+        in, shifted by how much the genomes of that round lost or gained on
+        average from the previous round's boards to these. Every round thus
+        keeps the mean fitness its genomes had before, while the order among
+        them comes from the extra games.
+        """
+        fitness = {}
+        shift = 0.0
+        previous = None
+        for racing, played in rounds:
+            means = {genome_id: sum(scores[genome_id][:played]) / played for genome_id in racing}
+            if previous is not None:
+                shift += sum(sum(scores[genome_id][:previous]) / previous - means[genome_id]
+                             for genome_id in racing) / len(racing)
+            for genome_id in racing:
+                fitness[genome_id] = means[genome_id] + shift
+            previous = played
+        return fitness
+
+    def race_targets(self, num_boards):
+        """Number of boards played by the end of each racing round"""
+        targets = [min(self.board_set_size, num_boards)]
+        while targets[-1] < num_boards:
+            targets.append(min(targets[-1] * self.racing_eta, num_boards))
+        return targets
+
+    def play(self, work, keys, config, board_set, boards):
+        """Fitness on every board of its range for every genome in work, or the mean without a board set"""
+        per_board = board_set is not None
+        if self.pool is None and self.coordinator is None:
+            return [eval_genome(genome, config, self.seed, board_set=board_set, boards=played, key=keys[genome_id],
+                                per_board=per_board)
+                    for (genome_id, genome), played in zip(work, boards)]
+        if not work:
+            return []
+        if self.coordinator is not None:
+            results = self.coordinator.map([(genome_id, keys[genome_id], played)
+                                            for (genome_id, _), played in zip(work, boards)], self.pack, board_set)
+        else:
+            # A few chunks per worker keeps every core busy without much IPC overhead
+            chunksize = max(1, len(work) // (self.num_workers * 4))
+            descriptor = board_set.share() if board_set is not None else None
+            tasks = [(genome_id, keys[genome_id], self.pack.location(keys[genome_id]), descriptor, played)
+                     for (genome_id, _), played in zip(work, boards)]
+            results = self.pool.map(_eval_genome_worker, tasks, chunksize)
+        fitnesses = []
+        for fitness, timings in results:
+            fitnesses.append(fitness)
+            if timings and profiling.timer is not None:
+                profiling.timer.merge(timings)
+        return fitnesses
+
+    def cached_score(self, key, board_set):
+        """Fitness on the first boards of the set already known for a genome hash"""
+        if self.fitness_cache is None:
+            return []
+        return self.fitness_cache.get((key, board_set.key)) or []
+
+    def report(self, genomes):
+        if self.pool is None and self.coordinator is None:
+            with profiling.phase('report'):
+                for genome_id, genome in genomes:
+                    print(f"Genome {genome_id} Avg Fitness: {genome.fitness:.2f}")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.coordinator is not None:
+            self.coordinator.close()
+            self.coordinator = None
+        if self.boards is not None:
+            self.boards.close()
+
+def create_evaluator(config, num_workers, seed, address=None, authkey=DISTRIBUTED_AUTHKEY):
+    evaluator = GenomeEvaluator(config, num_workers, seed, address=address, authkey=authkey)
+    if evaluator.coordinator is not None:
+        print(f"Coordinating workers on {evaluator.coordinator.address}, "
+              f"{num_workers or 0} local, seed {evaluator.seed}")
+    else:
+        print(f"Evaluating with {evaluator.num_workers} worker(s), seed {evaluator.seed}")
+    return evaluator
+
+def add_profiling(population):
+    """Time the training phases of every generation and write them to the trace files"""
+    timer = profiling.enable()
+    population.add_reporter(profiling.ProfilingReporter(
+        timer, PROFILE_CSV, PROFILE_JSON, PROFILE_GENERATION, PROFILE_DUMP))
+
+def run_neat(config_file, num_workers=1, seed=None, genome_file=GENOME_FILE,
+             profile=PROFILE_TRAINING, address=None, authkey=DISTRIBUTED_AUTHKEY, population_path=None):
+    """Train a new population; with an address, workers on other machines can help evaluate
+
+    Checkpoints and the final population are named after genome_file (see
+    checkpoint_prefix and genome_io.population_file), so runs with
+    different genome files keep apart; population_path overrides the latter.
+    """
     config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
                          neat.DefaultSpeciesSet, neat.DefaultStagnation,
                          config_file)
@@ -307,14 +570,23 @@ def run_neat(config_file):
     stats = neat.StatisticsReporter()
     population.add_reporter(stats)
     
-    # Checkpoint every 5 generations
-    population.add_reporter(neat.Checkpointer(5, filename_prefix='neat-checkpoint-'))
+    # Checkpoint every few generations, written in the background
+    checkpointer = AsyncCheckpointer(CHECKPOINT_INTERVAL, checkpoint_prefix(genome_file), CHECKPOINTS_KEPT)
+    population.add_reporter(checkpointer)
+    if profile:
+        add_profiling(population)
 
-    winner = population.run(eval_genomes, 100)  # Run for 100 generations
+    evaluator = create_evaluator(config, num_workers, seed, address, authkey)
+    try:
+        winner = population.run(evaluator.evaluate, 100)  # Run for 100 generations
+    finally:
+        evaluator.close()
+        checkpointer.wait()
 
-    with open("best_genome.pkl", "wb") as f:
-        pickle.dump(winner, f)
-    print("\nBest genome saved to 'best_genome.pkl'.")
+    population_path = population_path or population_file(genome_file)
+    save_genome(winner, genome_file)
+    save_population(population, population_path)
+    print(f"\nBest genome saved to '{genome_file}', population to '{population_path}'.")
     
     return winner
 
@@ -323,10 +595,7 @@ def play_with_best_genome(config_file, genome_file, visualize=True):
                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
                         config_file)
 
-    with open(genome_file, "rb") as f:
-        best_genome = pickle.load(f)
-
-    net = neat.nn.FeedForwardNetwork.create(best_genome, config)
+    net = load_network(genome_file, config)
 
     # Get difficulty settings from user
     if visualize:
@@ -350,18 +619,24 @@ def play_with_best_genome(config_file, genome_file, visualize=True):
         print(f"AI failed: {str(e)}")
         return None
 
-def continue_training(config_file, checkpoint=None):
+def continue_training(config_file, checkpoint=None, num_workers=1, seed=None, genome_file=None,
+                      profile=PROFILE_TRAINING, address=None, authkey=DISTRIBUTED_AUTHKEY, population_path=None):
+    """Resume from a checkpoint or saved population, or grow a population from the best genome
+
+    Checkpoints and the final population are named after genome_file, as in run_neat.
+    """
     config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
                          neat.DefaultSpeciesSet, neat.DefaultStagnation,
                          config_file)
     
-    if checkpoint:
+    if checkpoint and is_genome_file(checkpoint):
+        population = load_population(checkpoint, config)
+    elif checkpoint:
         population = neat.Checkpointer.restore_checkpoint(checkpoint)
     else:
         # Try to load the best genome and create a new population from it
         try:
-            with open("best_genome.pkl", "rb") as f:
-                best_genome = pickle.load(f)
+            best_genome = load_genome(genome_file or find_genome_file())
             
             print("Continuing training with the best genome as starting point...")
             population = neat.Population(config)
@@ -384,18 +659,30 @@ def continue_training(config_file, checkpoint=None):
     population.add_reporter(neat.StdOutReporter(True))
     stats = neat.StatisticsReporter()
     population.add_reporter(stats)
-    population.add_reporter(neat.Checkpointer(5, filename_prefix='neat-checkpoint-'))
+    checkpointer = AsyncCheckpointer(CHECKPOINT_INTERVAL, checkpoint_prefix(genome_file or GENOME_FILE),
+                                     CHECKPOINTS_KEPT)
+    population.add_reporter(checkpointer)
+    if profile:
+        add_profiling(population)
     
-    winner = population.run(eval_genomes, 50)
+    evaluator = create_evaluator(config, num_workers, seed, address, authkey)
+    try:
+        winner = population.run(evaluator.evaluate, 50)
+    finally:
+        evaluator.close()
+        checkpointer.wait()
     
-    with open("best_genome.pkl", "wb") as f:
-        pickle.dump(winner, f)
-    print("\nBest genome saved to 'best_genome.pkl'.")
+    genome_file = genome_file or GENOME_FILE
+    population_path = population_path or population_file(genome_file)
+    save_genome(winner, genome_file)
+    save_population(population, population_path)
+    print(f"\nBest genome saved to '{genome_file}', population to '{population_path}'.")
 
 if __name__ == "__main__":
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, "neat-config.txt")
 
+    load_pygame()
     if not pygame.get_init():
         pygame.init()
 
@@ -405,42 +692,35 @@ if __name__ == "__main__":
     print("2. Continue training from best genome")
     print("3. Continue training from checkpoint")
     print("4. Play with best AI (visualized)")
-    print("5. Test best AI performance (no visualization)")
+    print("5. Benchmark best AI performance (no visualization)")
     print("6. Exit")
     
     choice = input("\nSelect an option (1-6): ").strip()
     
     if choice == '1':
-        run_neat(config_path)
+        run_neat(config_path, TRAINING_WORKERS)
     elif choice == '2':
-        continue_training(config_path)
+        continue_training(config_path, num_workers=TRAINING_WORKERS)
     elif choice == '3':
-        checkpoint_files = [f for f in os.listdir('.') if f.startswith('neat-checkpoint-')]
-        if checkpoint_files:
-            checkpoint_files.sort()
-            checkpoint = checkpoint_files[-1]  # Get the latest checkpoint
+        # Only checkpoints of this config's run, so the network sizes match
+        checkpoint = latest_checkpoint(checkpoint_prefix(GENOME_FILE))
+        if checkpoint:
             print(f"Continuing from checkpoint: {checkpoint}")
-            continue_training(config_path, checkpoint)
+            continue_training(config_path, checkpoint, num_workers=TRAINING_WORKERS)
         else:
             print("No checkpoint files found. Starting fresh training...")
-            run_neat(config_path)
+            run_neat(config_path, TRAINING_WORKERS)
     elif choice == '4':
-        genome_file = "best_genome.pkl"
+        genome_file = find_genome_file()
         if os.path.exists(genome_file):
             play_with_best_genome(config_path, genome_file, visualize=True)
         else:
             print("No saved genome found. Please train the AI first.")
     elif choice == '5':
-        genome_file = "best_genome.pkl"
+        genome_file = find_genome_file()
         if os.path.exists(genome_file):
-            total_score = 0
-            games = 10
-            for i in range(games):
-                score = play_with_best_genome(config_path, genome_file, visualize=False)
-                total_score += score
-                print(f"Game {i+1}/{games}: Score = {score}")
-            
-            print(f"\nAverage score over {games} games: {total_score/games:.2f}")
+            import benchmark
+            benchmark.print_report(benchmark.run_benchmark(config_path, genome_file))
         else:
             print("No saved genome found. Please train the AI first.")
     elif choice == '6':
@@ -3,6 +3,8 @@ import sys
 import os
 import main
 import game
+from checkpoints import checkpoint_prefix, latest_checkpoint
+from genome_io import find_genome_file
 from settings import *
 
 class MainMenu:
@@ -109,7 +111,7 @@ class MainMenu:
         # Get the path to the config file and best genome
         local_dir = os.path.dirname(os.path.abspath(__file__))
         config_path = os.path.join(local_dir, "neat-config.txt")
-        genome_file = "best_genome.pkl"
+        genome_file = find_genome_file()
         
         if os.path.exists(genome_file):
             try:
@@ -143,19 +145,18 @@ class MainMenu:
         config_path = os.path.join(local_dir, "neat-config.txt")
         
         if choice == '1':
-            main.run_neat(config_path)
+            main.run_neat(config_path, TRAINING_WORKERS)
         elif choice == '2':
-            main.continue_training(config_path)
+            main.continue_training(config_path, num_workers=TRAINING_WORKERS)
         elif choice == '3':
-            checkpoint_files = [f for f in os.listdir('.') if f.startswith('neat-checkpoint-')]
-            if checkpoint_files:
-                checkpoint_files.sort()
-                checkpoint = checkpoint_files[-1]  # Get the latest checkpoint
+            # Only checkpoints of this config's run, so the network sizes match
+            checkpoint = latest_checkpoint(checkpoint_prefix(GENOME_FILE))
+            if checkpoint:
                 print(f"Continuing from checkpoint: {checkpoint}")
-                main.continue_training(config_path, checkpoint)
+                main.continue_training(config_path, checkpoint, num_workers=TRAINING_WORKERS)
             else:
                 print("No checkpoint files found. Starting fresh training...")
-                main.run_neat(config_path)
+                main.run_neat(config_path, TRAINING_WORKERS)
         
         # Wait for user to read results
         input("\nPress Enter to return to main menu...")
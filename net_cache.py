@@ -0,0 +1,73 @@
+import hashlib
+from collections import OrderedDict
+from itertools import chain
+import numpy as np
+from network import create_network
+
+def genome_hash(genome):
+    """Hash of everything that shapes a genome's network
+
+    Two genomes with the same nodes and the same enabled connections, down
+    to every weight, get the same hash whatever their keys or fitness.
+    Disabled connections do not reach the network and are left out.
+
+    The genes are gathered into packed arrays, sorted by key and hashed as
+    raw bytes, which is a few times cheaper than compiling the network.
+    """
+    nodes = sorted(genome.nodes.values(), key=lambda node: node.key)
+    node_values = np.array([(node.key, node.bias, node.response) for node in nodes], dtype=float)
+    names = ",".join(f"{node.activation}/{node.aggregation}" for node in nodes)
+
+    connections = [cg for cg in genome.connections.values() if cg.enabled]
+    keys = np.fromiter(chain.from_iterable(cg.key for cg in connections), np.int64,
+                       2 * len(connections)).reshape(-1, 2)
+    weights = np.fromiter((cg.weight for cg in connections), float, len(connections))
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (node_values.tobytes(), names.encode(), keys[order].tobytes(), weights[order].tobytes()):
+        digest.update(part)
+    return digest.digest()
+
+class LRUCache:
+    """A dict that forgets its least recently used entries beyond maxsize"""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """The cached value, or None"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+class NetworkCache(LRUCache):
+    """Compiled networks of recently seen genomes, so unchanged genomes are not rebuilt
+
+    Elites and offspring that came through reproduction unchanged have the
+    same structure as a genome already compiled and reuse its network.
+    """
+    def network(self, genome, config, key=None):
+        """The compiled network of a genome; pass its genome_hash as key when it is known"""
+        if key is None:
+            key = genome_hash(genome)
+        net = self.get(key)
+        if net is None:
+            net = create_network(genome, config)
+            self.put(key, net)
+        return net
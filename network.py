@@ -0,0 +1,155 @@
+import numpy as np
+import neat
+from neat.graphs import required_for_output
+
+# NumPy versions of the neat-python activation functions, same clamping
+ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    'tanh': lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    'sin': lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    'gauss': lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+    'relu': lambda z: np.maximum(z, 0.0),
+    'softplus': lambda z: 0.2 * np.log1p(np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    'identity': lambda z: z,
+    'clamped': lambda z: np.clip(z, -1.0, 1.0),
+    'abs': np.abs,
+    'hat': lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    'square': lambda z: z ** 2,
+    'cube': lambda z: z ** 3,
+    'exp': lambda z: np.exp(np.clip(z, -60.0, 60.0)),
+}
+
+class CompiledNetwork:
+    """A feed-forward NEAT network compiled into one weight matrix per layer
+
+    Nodes are grouped into topological layers. Each layer keeps the indices of
+    the values it reads and a dense (sources x nodes) weight matrix, so a batch
+    of board states is evaluated with one matrix product per layer instead of
+    a Python loop per node and connection. Only the 'sum' aggregation is
+    supported; use create_network() to fall back to neat-python otherwise.
+    """
+    def __init__(self, num_inputs, output_slots, layers, num_values):
+        self.num_inputs = num_inputs
+        self.output_slots = output_slots
+        self.layers = layers  # [(sources, weights, slots, bias, response, activations)]
+        self.num_values = num_values
+
+    @staticmethod
+    def create(genome, config):
+        """Compile a genome; raise ValueError if it uses an unsupported function"""
+        nodes = {key: (ng.bias, ng.response, ng.activation, ng.aggregation) for key, ng in genome.nodes.items()}
+        enabled = [cg for cg in genome.connections.values() if cg.enabled]
+        keys = np.array([cg.key for cg in enabled], dtype=np.int64).reshape(-1, 2)
+        weights = np.fromiter((cg.weight for cg in enabled), float, len(enabled))
+        return CompiledNetwork.from_arrays(config, nodes, keys[:, 0], keys[:, 1], weights)
+
+    @staticmethod
+    def from_arrays(config, nodes, sources, targets, weights):
+        """Compile from node genes and the expressed connections as arrays
+
+        nodes maps a node key to (bias, response, activation, aggregation);
+        sources, targets and weights describe one enabled connection each.
+        """
+        genome_config = config.genome_config
+        input_keys = np.array(genome_config.input_keys, dtype=np.int64)
+        output_keys = list(genome_config.output_keys)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+
+        # Every key gets an index into the per-node arrays below
+        all_keys = np.unique(np.concatenate([input_keys, np.array(list(nodes), dtype=np.int64),
+                                             np.array(output_keys, dtype=np.int64), sources, targets]))
+        source_index = np.searchsorted(all_keys, sources)
+        target_index = np.searchsorted(all_keys, targets)
+        is_input = np.isin(all_keys, input_keys)
+
+        # The nodes the outputs depend on, as in neat.graphs.required_for_output
+        required = np.isin(all_keys, output_keys)
+        reached = required.copy()
+        while True:
+            feeding = reached[target_index] & ~reached[source_index]
+            if not feeding.any():
+                break
+            new = np.zeros(len(all_keys), dtype=bool)
+            new[source_index[feeding]] = True
+            if not (new & ~is_input).any():
+                break
+            required |= new & ~is_input
+            reached |= new
+
+        # A node's layer is its longest path from the inputs. Nodes fed by
+        # anything that never gets a value are skipped, as in neat-python.
+        depth = np.where(is_input, 0, -1)
+        has_links = np.bincount(target_index, minlength=len(all_keys)) > 0
+        candidates = required & has_links & ~is_input
+        while True:
+            source_depth = depth[source_index]
+            unknown = np.bincount(target_index, weights=source_depth < 0, minlength=len(all_keys))
+            deepest = np.full(len(all_keys), -1)
+            np.maximum.at(deepest, target_index, source_depth)
+            ready = candidates & (depth < 0) & (unknown == 0)
+            if not ready.any():
+                break
+            depth[ready] = deepest[ready] + 1
+
+        # Value slots: inputs first, then evaluated nodes in layer order, then
+        # one slot that stays at zero for outputs that are never computed
+        slot = np.full(len(all_keys), -1)
+        slot[np.searchsorted(all_keys, input_keys)] = np.arange(len(input_keys))
+        evaluated = np.flatnonzero(depth > 0)
+        # Sorting by (depth, key) gives each layer its nodes in key order
+        evaluated = evaluated[np.lexsort((all_keys[evaluated], depth[evaluated]))]
+        slot[evaluated] = len(input_keys) + np.arange(len(evaluated))
+        zero_slot = len(input_keys) + len(evaluated)
+
+        layers = []
+        for d in np.unique(depth[evaluated]):
+            layer = evaluated[depth[evaluated] == d]
+            feeds = depth[target_index] == d
+            source_slots = slot[source_index[feeds]]
+            layer_sources = np.unique(source_slots)
+            matrix = np.zeros((len(layer_sources), len(layer)))
+            matrix[np.searchsorted(layer_sources, source_slots),
+                   slot[target_index[feeds]] - slot[layer[0]]] = weights[feeds]
+            activations = {}
+            for column, key in enumerate(all_keys[layer].tolist()):
+                _, _, activation, aggregation = nodes[key]
+                if aggregation != 'sum':
+                    raise ValueError(f"Unsupported aggregation '{aggregation}'")
+                if activation not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation '{activation}'")
+                activations.setdefault(activation, []).append(column)
+            bias = np.array([nodes[key][0] for key in all_keys[layer].tolist()])
+            response = np.array([nodes[key][1] for key in all_keys[layer].tolist()])
+            groups = [(ACTIVATIONS[name], np.array(columns)) for name, columns in activations.items()]
+            layers.append((layer_sources, matrix, slot[layer], bias, response, groups))
+
+        output_slots = np.array([slot[i] if slot[i] >= 0 else zero_slot
+                                 for i in np.searchsorted(all_keys, output_keys)])
+        return CompiledNetwork(len(input_keys), output_slots, layers, zero_slot + 1)
+
+    def activate_batch(self, inputs):
+        """Evaluate a (batch, num_inputs) array of states; return (batch, num_outputs)"""
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.ndim != 2 or inputs.shape[1] != self.num_inputs:
+            raise RuntimeError(f"Expected {self.num_inputs:n} inputs, got {inputs.shape[-1]:n}")
+        values = np.zeros((inputs.shape[0], self.num_values))
+        values[:, :self.num_inputs] = inputs
+        for sources, weights, slots, bias, response, groups in self.layers:
+            z = bias + response * (values[:, sources] @ weights)
+            for function, columns in groups:
+                z[:, columns] = function(z[:, columns])
+            values[:, slots] = z
+        return values[:, self.output_slots]
+
+    def activate(self, inputs):
+        """Evaluate a single state, like neat.nn.FeedForwardNetwork.activate"""
+        return self.activate_batch(np.asarray(inputs, dtype=float)[None, :])[0].tolist()
+
+def create_network(genome, config):
+    """Compile a genome when possible, otherwise build the neat-python network"""
+    try:
+        return CompiledNetwork.create(genome, config)
+    except ValueError:
+        return neat.nn.FeedForwardNetwork.create(genome, config)
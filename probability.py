@@ -0,0 +1,174 @@
+import time
+from math import comb
+import numpy as np
+
+class SearchAborted(Exception):
+    """Raised when the exact search gives up and the fallback is used"""
+
+class ProbabilityEngine:
+    """Exact mine probabilities for every unrevealed cell of a BoardEngine
+
+    The frontier (hidden cells next to a revealed clue) is split into
+    independent components that share no clue. Each component is enumerated
+    by backtracking, counting solutions per number of mines. Components are
+    then combined with the global mine count, weighting every total by the
+    number of ways to place the remaining mines in the interior cells.
+    Flags are assumed to be correct.
+
+    When the search exceeds the timeout or a component is too large, the
+    engine falls back to the plain mine density of the hidden cells and
+    sets exact to False.
+    """
+    def __init__(self, timeout=0.05, max_component_size=64):
+        self.timeout = timeout
+        self.max_component_size = max_component_size
+        self.exact = True  # Whether the last result came from the full enumeration
+
+    def compute(self, board):
+        """Return a (rows, cols) array with the mine probability of every cell"""
+        hidden = ~board.revealed & ~board.flagged
+        probabilities = np.where(board.revealed, board.mine, board.flagged).astype(float)
+        mines_left = board.mines - int(np.count_nonzero(board.flagged))
+        hidden_count = int(np.count_nonzero(hidden))
+        if hidden_count == 0:
+            self.exact = True
+            return probabilities
+
+        try:
+            self.deadline = time.perf_counter() + self.timeout if self.timeout else None
+            self._solve(board, hidden, mines_left, probabilities)
+            self.exact = True
+        except SearchAborted:
+            probabilities[hidden] = min(1.0, max(0.0, mines_left / hidden_count))
+            self.exact = False
+        return probabilities
+
+    def _solve(self, board, hidden, mines_left, probabilities):
+        constraints, cell_constraints = self._constraints(board, hidden)
+        frontier = list(cell_constraints)
+        interior = [(int(x), int(y)) for x, y in np.argwhere(hidden) if (int(x), int(y)) not in cell_constraints]
+
+        components = []
+        for cells in self._components(frontier, constraints, cell_constraints):
+            if len(cells) > self.max_component_size:
+                raise SearchAborted()
+            components.append((cells, self._enumerate(cells, constraints, cell_constraints, mines_left)))
+
+        # Ways to place t mines over the whole frontier, for every t
+        totals = [1]
+        for _, (counts, _) in components:
+            totals = self._convolve(totals, counts)
+
+        def interior_ways(frontier_mines):
+            rest = mines_left - frontier_mines
+            return comb(len(interior), rest) if 0 <= rest <= len(interior) else 0
+
+        total_weight = sum(ways * interior_ways(t) for t, ways in enumerate(totals))
+        if total_weight == 0:
+            # The visible clues do not fit the mine count, e.g. after a wrong flag
+            raise SearchAborted()
+
+        for index, (cells, (counts, cell_counts)) in enumerate(components):
+            # Solutions of every other component, combined
+            others = [1]
+            for other_index, (_, (other_counts, _)) in enumerate(components):
+                if other_index != index:
+                    others = self._convolve(others, other_counts)
+            weights = [sum(ways * interior_ways(k + t) for t, ways in enumerate(others))
+                       for k in range(len(counts))]
+            for position, (x, y) in enumerate(cells):
+                mine_weight = sum(cell_counts[k][position] * weights[k] for k in range(len(counts)))
+                probabilities[x, y] = mine_weight / total_weight
+
+        if interior:
+            interior_mines = sum(ways * interior_ways(t) * (mines_left - t) for t, ways in enumerate(totals))
+            probabilities[tuple(np.array(interior).T)] = interior_mines / (total_weight * len(interior))
+
+    def _constraints(self, board, hidden):
+        """Collect [hidden cells, mines among them] for every revealed clue touching hidden cells"""
+        constraints = []
+        cell_constraints = {}
+        for x, y in np.argwhere(board.revealed & ~board.mine & (board.clues > 0)):
+            x0, y0 = max(0, x - 1), max(0, y - 1)
+            area = hidden[x0:x + 2, y0:y + 2]
+            if not area.any():
+                continue
+            flags = int(np.count_nonzero(board.flagged[x0:x + 2, y0:y + 2]))
+            cells = [(int(x0 + dx), int(y0 + dy)) for dx, dy in np.argwhere(area)]
+            for cell in cells:
+                cell_constraints.setdefault(cell, []).append(len(constraints))
+            constraints.append((cells, int(board.clues[x, y]) - flags))
+        return constraints, cell_constraints
+
+    def _components(self, frontier, constraints, cell_constraints):
+        """Split the frontier into groups of cells linked by shared clues, each in search order"""
+        seen = set()
+        for start in frontier:
+            if start in seen:
+                continue
+            # Breadth-first order keeps linked cells close together, which prunes early
+            seen.add(start)
+            cells = [start]
+            for cell in cells:
+                for index in cell_constraints[cell]:
+                    for neighbour in constraints[index][0]:
+                        if neighbour not in seen:
+                            seen.add(neighbour)
+                            cells.append(neighbour)
+            yield cells
+
+    def _enumerate(self, cells, constraints, cell_constraints, mines_left):
+        """Count the solutions of one component per number of mines, and per cell"""
+        indices = sorted({index for cell in cells for index in cell_constraints[cell]})
+        target = {index: constraints[index][1] for index in indices}
+        placed = {index: 0 for index in indices}
+        unassigned = {index: len(constraints[index][0]) for index in indices}
+        cell_indices = [cell_constraints[cell] for cell in cells]
+        limit = min(mines_left, len(cells))
+
+        counts = [0] * (limit + 1)
+        cell_counts = [[0] * len(cells) for _ in range(limit + 1)]
+        assignment = [0] * len(cells)
+        nodes = 0
+
+        def search(position, mines):
+            nonlocal nodes
+            nodes += 1
+            if self.deadline is not None and nodes % 1024 == 0 and time.perf_counter() > self.deadline:
+                raise SearchAborted()
+            if position == len(cells):
+                counts[mines] += 1
+                row = cell_counts[mines]
+                for i, value in enumerate(assignment):
+                    row[i] += value
+                return
+
+            for value in (0, 1):
+                if mines + value > limit:
+                    break
+                valid = True
+                for index in cell_indices[position]:
+                    placed[index] += value
+                    unassigned[index] -= 1
+                    if placed[index] > target[index] or placed[index] + unassigned[index] < target[index]:
+                        valid = False
+                if valid:
+                    assignment[position] = value
+                    search(position + 1, mines + value)
+                for index in cell_indices[position]:
+                    placed[index] -= value
+                    unassigned[index] += 1
+            assignment[position] = 0
+
+        search(0, 0)
+        return counts, cell_counts
+
+    @staticmethod
+    def _convolve(a, b):
+        """Multiply two polynomials given as coefficient lists"""
+        result = [0] * (len(a) + len(b) - 1)
+        for i, x in enumerate(a):
+            if x:
+                for j, y in enumerate(b):
+                    result[i + j] += x * y
+        return result
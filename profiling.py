@@ -0,0 +1,133 @@
+import cProfile
+import csv
+import json
+import time
+from contextlib import contextmanager, nullcontext
+import neat
+
+# Phases timed during training, in the order they are written to the trace
+PHASES = ['board', 'network', 'activation', 'probability', 'logic', 'report']
+
+class PhaseTimer:
+    """Cumulative wall time and call count for every named phase"""
+    def __init__(self):
+        self.seconds = {}
+        self.counts = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds, count=1):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def merge(self, snapshot):
+        """Add the totals of another timer, e.g. one from a worker process"""
+        for name, (seconds, count) in snapshot.items():
+            self.add(name, seconds, count)
+
+    def snapshot(self):
+        return {name: (self.seconds[name], self.counts[name]) for name in self.seconds}
+
+    def reset(self):
+        self.seconds = {}
+        self.counts = {}
+
+# The timer of this process, None while profiling is off
+timer = None
+_disabled = nullcontext()
+
+def phase(name):
+    """Context manager timing a phase, doing nothing while profiling is off"""
+    if timer is None:
+        return _disabled
+    return timer.phase(name)
+
+def enable():
+    """Start timing phases in this process and return the timer"""
+    global timer
+    if timer is None:
+        timer = PhaseTimer()
+    return timer
+
+def collect():
+    """Return and clear the totals of this process, or None while profiling is off"""
+    if timer is None:
+        return None
+    snapshot = timer.snapshot()
+    timer.reset()
+    return snapshot
+
+class ProfilingReporter(neat.reporting.BaseReporter):
+    """Write the phase timings of every generation to a CSV and a JSON trace
+
+    One generation can also be run under cProfile and dumped to a .prof file
+    for pstats or snakeviz. With worker processes the phase timings cover
+    every worker, while cProfile only sees the main process.
+    """
+    def __init__(self, timer, csv_file=None, json_file=None, profile_generation=None,
+                 profile_file="training.prof"):
+        self.timer = timer
+        self.csv_file = csv_file
+        self.json_file = json_file
+        self.profile_generation = profile_generation
+        self.profile_file = profile_file
+        self.trace = []
+        self.generation = None
+        self.start = None
+        self.profiler = None
+
+        if csv_file:
+            with open(csv_file, "w", newline="") as f:
+                header = ['generation', 'genomes', 'wall_seconds']
+                for name in PHASES:
+                    header += [f'{name}_seconds', f'{name}_count']
+                csv.writer(f).writerow(header)
+
+    def __getstate__(self):
+        # Checkpoints pickle the reporters; a running profiler cannot be pickled
+        state = self.__dict__.copy()
+        state['profiler'] = None
+        return state
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.timer.reset()
+        if generation == self.profile_generation:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+
+    def end_generation(self, config, population, species_set):
+        wall = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_file)
+            print(f"cProfile of generation {self.generation} written to '{self.profile_file}'")
+            self.profiler = None
+
+        phases = self.timer.snapshot()
+        record = {
+            'generation': self.generation,
+            'genomes': len(population),
+            'wall_seconds': wall,
+            'phases': {name: {'seconds': seconds, 'count': count}
+                       for name, (seconds, count) in phases.items()},
+        }
+        self.trace.append(record)
+
+        if self.csv_file:
+            row = [self.generation, len(population), f'{wall:.6f}']
+            for name in PHASES:
+                seconds, count = phases.get(name, (0.0, 0))
+                row += [f'{seconds:.6f}', count]
+            with open(self.csv_file, "a", newline="") as f:
+                csv.writer(f).writerow(row)
+        if self.json_file:
+            with open(self.json_file, "w") as f:
+                json.dump(self.trace, f, indent=2)
@@ -1,4 +1,3 @@
-import pygame
 import os
 
 # Colours
@@ -33,19 +32,37 @@ DIFFICULTY_SETTINGS = {
 DEFAULT_TRAINING_SIZE = 5  # Default size for AI training boards
 MAX_TRAINING_SIZE = 10     # Maximum size for AI training
 MIN_TRAINING_SIZE = 4      # Minimum size for AI training
+TRAINING_WORKERS = os.cpu_count() or 1  # Worker processes used to evaluate genomes
+BOARD_SET_SIZE = 8          # Boards shared by every genome of a generation, 0 for fresh random boards per genome
+RACING_BOARDS = 0           # Boards the best genomes race on beyond BOARD_SET_SIZE, 0 to turn racing off
+RACING_ETA = 2              # Each racing round keeps the top 1 / RACING_ETA and multiplies their boards by this
+BOARD_SET_ROTATE = True     # Draw a new board set every generation instead of reusing one
+NETWORK_CACHE_SIZE = 512    # Compiled networks kept per process, keyed by genome structure
+FITNESS_CACHE_SIZE = 4096   # Fitness results kept per genome structure on a fixed board set, 0 to disable
+FIRST_CLICK_SAFE_RADIUS = 0  # Mine-free cells around the first click: 0 for the cell, 1 for its neighbours too
 
-# Load tile images
-tile_numbers = []
-try:
-    for i in range(1, 9):
-        tile_numbers.append(pygame.transform.scale(pygame.image.load(os.path.join("assets", f"Tile{i}.png")), (TILESIZE, TILESIZE)))
-
-    tile_empty = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileEmpty.png")), (TILESIZE, TILESIZE))
-    tile_exploded = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileExploded.png")), (TILESIZE, TILESIZE))
-    tile_flag = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileFlag.png")), (TILESIZE, TILESIZE))
-    tile_mine = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileMine.png")), (TILESIZE, TILESIZE))
-    tile_not_mine = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileNotMine.png")), (TILESIZE, TILESIZE))
-    tile_unknown = pygame.transform.scale(pygame.image.load(os.path.join("assets", "TileUnknown.png")), (TILESIZE, TILESIZE))
-except pygame.error:
-    # If images fail to load, this will be handled when pygame is properly initialized
-    pass
\ No newline at end of file
+GENOME_FILE = "best_genome.bin"         # Best genome in the compact binary format
+LEGACY_GENOME_FILE = "best_genome.pkl"  # Pickled best genome written by older versions
+POPULATION_SUFFIX = "-population.bin"   # Final population of a run, saved as its genome file's name plus this
+CHECKPOINT_SUFFIX = "-checkpoint-"     # Checkpoints of a run are its genome file's name plus this and the generation
+CHECKPOINT_INTERVAL = 5                 # Generations between checkpoints
+CHECKPOINTS_KEPT = 3                    # Older checkpoints are deleted
+
+# Distributed training settings
+DISTRIBUTED_HOST = "127.0.0.1"          # Interface the training coordinator listens on
+DISTRIBUTED_PORT = 6010                 # Port the training coordinator listens on
+DISTRIBUTED_AUTHKEY = None              # Shared secret (bytes) for workers; required off loopback, None is random
+DISTRIBUTED_BATCH_SIZE = 8              # Genomes sent to a worker at a time
+HEARTBEAT_INTERVAL = 2.0                # Seconds between worker heartbeats
+WORKER_TIMEOUT = 30.0                   # Silent workers are dropped and their batch re-dispatched
+
+# Probability engine settings
+PROBABILITY_TIMEOUT = 0.05  # Seconds allowed for the exact enumeration before falling back
+PROBABILITY_MARGIN = 0.02   # Cells this close to the lowest mine probability stay candidates
+
+# Training profiling settings
+PROFILE_TRAINING = False                   # Record per-generation phase timings while training
+PROFILE_CSV = "training-profile.csv"       # Per-generation timing trace
+PROFILE_JSON = "training-profile.json"
+PROFILE_GENERATION = 1                     # Generation run under cProfile, None to skip
+PROFILE_DUMP = "training.prof"             # cProfile output, readable with pstats
@@ -0,0 +1,132 @@
+import numpy as np
+
+class LogicSolver:
+    """Deterministic single-clue deductions on a BoardEngine
+
+    Instead of sweeping the whole board on every pass, the solver keeps a
+    worklist of revealed clue cells whose neighbourhood changed since they
+    were last examined, so the work per pass follows what actually changed.
+    """
+    def __init__(self, board):
+        self.board = board
+        # Ask the board to record every cell it reveals or flags
+        self.board.changes = []
+        self.dirty = set()
+        self.moves = 0  # Digs and flags made by the solver
+        # Clues revealed before the solver was attached still need a look
+        for x, y in np.argwhere(board.revealed & ~board.mine & (board.clues > 0)):
+            self.dirty.add((int(x), int(y)))
+
+    def collect_changes(self):
+        """Move the cells changed on the board into the worklist as dirty clues"""
+        board = self.board
+        changes = board.changes
+        if not changes:
+            return
+        board.changes = []
+        for cx, cy in changes:
+            for x in range(max(0, cx - 1), min(board.rows, cx + 2)):
+                for y in range(max(0, cy - 1), min(board.cols, cy + 2)):
+                    if board.revealed[x, y] and not board.mine[x, y] and board.clues[x, y] > 0:
+                        self.dirty.add((x, y))
+
+    def neighbourhood(self, x, y):
+        """Return the number of flagged neighbours and the list of hidden unflagged ones"""
+        board = self.board
+        x0, y0 = max(0, x - 1), max(0, y - 1)
+        revealed = board.revealed[x0:x + 2, y0:y + 2]
+        flagged = board.flagged[x0:x + 2, y0:y + 2]
+        hidden = [(x0 + int(dx), y0 + int(dy)) for dx, dy in np.argwhere(~revealed & ~flagged)]
+        return int(np.count_nonzero(flagged & ~revealed)), hidden
+
+    def step(self):
+        """Examine every dirty clue once; return (made_progress, hit_mine)"""
+        self.collect_changes()
+        work = sorted(self.dirty)
+        self.dirty = set()
+        progress = False
+
+        for x, y in work:
+            flagged_count, hidden = self.neighbourhood(x, y)
+            if not hidden:
+                continue
+            adjacent_number = self.board.clues[x, y]
+
+            # If the number of adjacent unrevealed tiles equals the number, they must all be mines
+            if adjacent_number - flagged_count == len(hidden):
+                for hx, hy in hidden:
+                    self.board.set_flag(hx, hy)
+                self.moves += len(hidden)
+                progress = True
+
+            # If the number of adjacent flags equals the number, all other unrevealed are safe
+            elif adjacent_number == flagged_count:
+                for hx, hy in hidden:
+                    self.moves += 1
+                    if not self.board.dig(hx, hy):
+                        return progress, True  # Hit a mine
+                progress = True
+
+        self.collect_changes()
+        return progress, False
+
+    def constraints(self):
+        """Return (hidden cells, mines left among them) for every revealed clue on the frontier"""
+        board = self.board
+        result = []
+        for x, y in np.argwhere(board.revealed & ~board.mine & (board.clues > 0)):
+            x, y = int(x), int(y)
+            flagged_count, hidden = self.neighbourhood(x, y)
+            if hidden:
+                result.append((frozenset(hidden), int(board.clues[x, y]) - flagged_count))
+        return result
+
+    def pair_step(self):
+        """Combine pairs of overlapping clues; return (made_progress, hit_mine)
+
+        For clues A and B, the mines shared by both cannot exceed B's count.
+        If A needs every cell outside B plus B's full count, the cells of A
+        outside B are all mines and the cells of B outside A are all safe. With
+        A inside B this is the subset rule, and it also settles patterns like
+        1-2-1 that no single clue decides.
+        """
+        constraints = self.constraints()
+        by_cell = {}
+        for index, (cells, _) in enumerate(constraints):
+            for cell in cells:
+                by_cell.setdefault(cell, []).append(index)
+
+        mines, safes = set(), set()
+        for a, (cells_a, mines_a) in enumerate(constraints):
+            partners = {b for cell in cells_a for b in by_cell[cell] if b != a}
+            for b in partners:
+                cells_b, mines_b = constraints[b]
+                only_a = cells_a - cells_b
+                if mines_a - len(only_a) == mines_b:
+                    mines.update(only_a)
+                    safes.update(cells_b - cells_a)
+
+        progress = False
+        for x, y in sorted(mines - safes):
+            self.board.set_flag(x, y)
+            self.moves += 1
+            progress = True
+        for x, y in sorted(safes - mines):
+            self.moves += 1
+            if not self.board.flagged[x, y] and not self.board.dig(x, y):
+                return progress, True  # Hit a mine
+            progress = True
+
+        self.collect_changes()
+        return progress, False
+
+    def solve(self, use_pairs=True):
+        """Apply the rules until nothing changes; return False if a mine was hit"""
+        while True:
+            progress, hit_mine = self.step()
+            if not progress and not hit_mine and use_pairs:
+                progress, hit_mine = self.pair_step()
+            if hit_mine:
+                return False
+            if not progress:
+                return True
@@ -0,0 +1,57 @@
+import os
+import random
+import neat
+import pytest
+from main import GenomeEvaluator
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def config():
+    return neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                       neat.DefaultStagnation, os.path.join(LOCAL_DIR, "neat-config-local.txt"))
+
+def make_evaluator(config, **kwargs):
+    return GenomeEvaluator(config, 1, seed=1, fitness_cache_size=0, **kwargs)
+
+def test_race_targets(config):
+    evaluator = make_evaluator(config, board_set_size=4, racing_boards=16, racing_eta=2)
+    assert evaluator.race_targets(16) == [4, 8, 16]
+    assert evaluator.race_targets(12) == [4, 8, 12]
+    evaluator.close()
+    evaluator = make_evaluator(config, board_set_size=4, racing_boards=0)
+    assert evaluator.race_targets(4) == [4]
+    evaluator.close()
+
+def test_race_cut_and_fitness(config):
+    evaluator = make_evaluator(config, board_set_size=4, racing_boards=8, racing_eta=2)
+    scores = {1: [10] * 4 + [0] * 4, 2: [8] * 8, 3: [5] * 8, 4: [1] * 8}
+    rounds = [([1, 2, 3, 4], 4)]
+    assert evaluator.race_fitness(rounds, scores) == {1: 10, 2: 8, 3: 5, 4: 1}
+    assert evaluator.race_cut([1, 2, 3, 4], scores, rounds) == [1, 2]
+
+    # Genome 1 fell from 10 to 5 on the extra boards and genome 2 held 8,
+    # so the pair is shifted by 2.5 to keep its mean of 9 from the first round
+    rounds.append(([1, 2], 8))
+    assert evaluator.race_fitness(rounds, scores) == {1: 7.5, 2: 10.5, 3: 5, 4: 1}
+    evaluator.close()
+
+def test_contenders_play_more_boards(config):
+    random.seed(0)
+    genomes = []
+    for key in range(1, 9):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        genomes.append((key, genome))
+    evaluator = make_evaluator(config, board_set_size=2, racing_boards=8, racing_eta=2)
+    played = {}
+    play = evaluator.play
+    def spy(work, keys, config, board_set, boards):
+        for (genome_id, _), genome_boards in zip(work, boards):
+            played[genome_id] = played.get(genome_id, 0) + len(genome_boards)
+        return play(work, keys, config, board_set, boards)
+    evaluator.play = spy
+    evaluator.evaluate(genomes, config)
+    evaluator.close()
+    assert sorted(played.values()) == [2, 2, 2, 2, 4, 4, 8, 8]
+    assert all(genome.fitness is not None for _, genome in genomes)
@@ -0,0 +1,52 @@
+import os
+import random
+import neat
+import numpy as np
+import pytest
+from network import ACTIVATIONS, CompiledNetwork
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_config(name):
+    return neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                       neat.DefaultStagnation, os.path.join(LOCAL_DIR, name))
+
+def evolved_genomes(config, count, mutations, seed):
+    """Genomes with hidden nodes, disabled connections and mixed activations"""
+    random.seed(seed)
+    config.genome_config.activation_options = sorted(ACTIVATIONS)
+    config.genome_config.activation_mutate_rate = 0.3
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(mutations):
+            genome.mutate(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_neat_feed_forward(seed):
+    config = load_config("neat-config-local.txt")
+    inputs = np.random.default_rng(seed).normal(size=(6, len(config.genome_config.input_keys)))
+    for genome in evolved_genomes(config, 20, 30, seed):
+        expected = neat.nn.FeedForwardNetwork.create(genome, config)
+        outputs = CompiledNetwork.create(genome, config).activate_batch(inputs)
+        for row, output in zip(inputs, outputs):
+            assert output == pytest.approx(expected.activate(row.tolist()), rel=1e-9, abs=1e-12)
+
+def test_matches_neat_on_full_board_network():
+    config = load_config("neat-config.txt")
+    genome = evolved_genomes(config, 1, 3, 0)[0]
+    inputs = np.random.default_rng(0).normal(size=(2, len(config.genome_config.input_keys)))
+    expected = neat.nn.FeedForwardNetwork.create(genome, config)
+    outputs = CompiledNetwork.create(genome, config).activate_batch(inputs)
+    for row, output in zip(inputs, outputs):
+        assert output == pytest.approx(expected.activate(row.tolist()), rel=1e-9, abs=1e-12)
+
+def test_unsupported_aggregation_is_refused():
+    config = load_config("neat-config-local.txt")
+    genome = evolved_genomes(config, 1, 0, 0)[0]
+    next(iter(genome.nodes.values())).aggregation = 'max'
+    with pytest.raises(ValueError):
+        CompiledNetwork.create(genome, config)
@@ -0,0 +1,43 @@
+from itertools import combinations
+import numpy as np
+import pytest
+from engine import BoardEngine, count_adjacent
+from probability import ProbabilityEngine
+
+def brute_force(board):
+    """Mine probability of every hidden cell, over all layouts that fit the visible clues"""
+    hidden = [(int(x), int(y)) for x, y in np.argwhere(~board.revealed & ~board.flagged)]
+    clue_cells = board.revealed & ~board.mine
+    mines_left = board.mines - int(np.count_nonzero(board.flagged))
+    counts = np.zeros((board.rows, board.cols))
+    layouts = 0
+    for cells in combinations(hidden, mines_left):
+        mine = board.flagged.copy()
+        for cell in cells:
+            mine[cell] = True
+        if np.array_equal(count_adjacent(mine)[clue_cells], board.clues[clue_cells]):
+            layouts += 1
+            for cell in cells:
+                counts[cell] += 1
+    return counts / layouts, hidden
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    rows, cols = int(rng.integers(3, 6)), int(rng.integers(3, 6))
+    board = BoardEngine(rows, cols, int(rng.integers(2, 5)), rng=seed)
+    board.dig(int(rng.integers(rows)), int(rng.integers(cols)))
+    # A few more safe digs and a correct flag give several frontier components
+    safe = np.argwhere(~board.mine & ~board.revealed)
+    for x, y in safe[rng.permutation(len(safe))[:2]]:
+        board.dig(int(x), int(y))
+    mines = np.argwhere(board.mine)
+    if seed % 2:
+        board.set_flag(*(int(v) for v in mines[0]))
+
+    engine = ProbabilityEngine(timeout=0)
+    probabilities = engine.compute(board)
+    expected, hidden = brute_force(board)
+    assert engine.exact
+    for cell in hidden:
+        assert probabilities[cell] == pytest.approx(expected[cell], abs=1e-12)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from engine import BoardEngine
+from solver import LogicSolver
+
+@pytest.mark.parametrize("rows, cols, mines", [(5, 5, 3), (9, 9, 10), (16, 16, 40), (8, 8, 20)])
+@pytest.mark.parametrize("use_pairs", [False, True])
+def test_never_flags_a_safe_cell_or_digs_a_mine(rows, cols, mines, use_pairs):
+    for seed in range(40):
+        board = BoardEngine(rows, cols, mines, rng=seed, deferred=True)
+        board.dig(rows // 2, cols // 2)
+        solver = LogicSolver(board)
+        assert solver.solve(use_pairs)
+        assert not (board.flagged & ~board.mine).any()
+        assert not (board.revealed & board.mine).any()
+
+def test_pair_rule_settles_one_two_one():
+    # 1-2-1 along the top row of a 2x3 board: the outer hidden cells are mines
+    board = BoardEngine(2, 3, 2)
+    board.set_layout(np.array([[False, False, False], [True, False, True]]))
+    board.first_move = False
+    for y in range(3):
+        board.set_revealed(0, y)
+    solver = LogicSolver(board)
+    assert solver.solve()
+    assert board.flagged[1, 0] and board.flagged[1, 2]
+    assert board.revealed[1, 1]
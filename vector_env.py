@@ -0,0 +1,152 @@
+import numpy as np
+from encoding import BoardEncoder
+from engine import count_adjacent
+
+class VectorMinesweeperEnv:
+    """N Minesweeper games of the same size, stepped together as stacked arrays
+
+    Every step takes one move per game (a flat cell index) and returns the
+    observations, rewards and done flags of all games. Finished games are
+    reset automatically, so the observation returned for them is already the
+    first state of the next game. Rewards are shaped like MinesweeperAI.play_game,
+    without the deterministic logic: the first dig of a game earns nothing and
+    counts as one revealed cell, so the cells its opening uncovered are
+    rewarded with the next safe dig.
+    """
+    def __init__(self, num_games, rows, cols, mines, seed=None):
+        self.num_games = num_games
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.total_safe = rows * cols - mines
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_games, rows, cols)
+        self.mine = np.zeros(shape, dtype=bool)
+        self.clues = np.zeros(shape, dtype=np.int8)
+        self.revealed = np.zeros(shape, dtype=bool)
+        self.flagged = np.zeros(shape, dtype=bool)
+        self.first_move = np.ones(num_games, dtype=bool)
+        self.safe_revealed = np.zeros(num_games, dtype=int)
+        self.episode_return = np.zeros(num_games)
+
+        # Totals over every game finished so far
+        self.games_played = 0
+        self.games_won = 0
+        self.returns = []
+
+        self.reset_games(np.arange(num_games))
+
+    def reset_games(self, games):
+        """Start new random boards for the given game indices"""
+        if len(games) == 0:
+            return
+        # The first `mines` cells of a random permutation hold the mines
+        order = np.argsort(self.rng.random((len(games), self.rows * self.cols)), axis=1)
+        mine = np.zeros((len(games), self.rows * self.cols), dtype=bool)
+        np.put_along_axis(mine, order[:, :self.mines], True, axis=1)
+        self.mine[games] = mine.reshape(len(games), self.rows, self.cols)
+        self.clues[games] = count_adjacent(self.mine[games])
+        self.revealed[games] = False
+        self.flagged[games] = False
+        self.first_move[games] = True
+        self.safe_revealed[games] = 0
+        self.episode_return[games] = 0.0
+
+    def observations(self):
+        """Board states as in BoardEngine.get_flat_state, shape (num_games, rows * cols)"""
+        hidden = np.where(self.flagged, 10, -1)
+        shown = np.where(self.mine, 9, self.clues)
+        return np.where(self.revealed, shown, hidden).reshape(self.num_games, -1)
+
+    def valid_moves(self):
+        """Mask of the cells each game may still dig, shape (num_games, rows * cols)"""
+        return ~(self.revealed | self.flagged).reshape(self.num_games, -1)
+
+    def step(self, moves):
+        """Dig one cell in every game; return (observations, rewards, dones)"""
+        moves = np.asarray(moves)
+        games = np.arange(self.num_games)
+        xs, ys = np.divmod(moves, self.cols)
+        rewards = np.zeros(self.num_games)
+        dones = np.zeros(self.num_games, dtype=bool)
+
+        first = self.first_move.copy()
+        self._make_first_moves_safe(games[first], xs[first], ys[first])
+        self.first_move[:] = False
+
+        # Digging a revealed or flagged cell changes nothing
+        playable = ~self.revealed[games, xs, ys] & ~self.flagged[games, xs, ys]
+        hit = playable & self.mine[games, xs, ys]
+        rewards[hit] -= 10
+        dones |= hit
+
+        safe = playable & ~hit
+        clicked = np.zeros_like(self.revealed)
+        clicked[games[safe], xs[safe], ys[safe]] = True
+        newly = self._flood_fill(clicked)
+        self.revealed |= newly | (hit[:, None, None] & self.mine)
+
+        # Same shaping as play_game: progress, plus a bonus for every extra cell an opening uncovers.
+        # safe_revealed is play_game's count, which lags behind the board after the first dig.
+        revealed_now = np.count_nonzero(self.revealed & ~self.mine, axis=(1, 2))
+        progress = (self.safe_revealed + 1) / self.total_safe
+        extra = np.maximum(revealed_now - self.safe_revealed - 1, 0)
+        rewarded = safe & ~first
+        rewards[rewarded] += 1 + progress[rewarded] * 0.5 + extra[rewarded] * 0.2
+        self.safe_revealed = np.where(first, self.safe_revealed + 1, np.where(safe, revealed_now, self.safe_revealed))
+
+        won = safe & (revealed_now == self.total_safe)
+        rewards[won] += 100 + 100 * self.safe_revealed[won] / self.total_safe
+        dones |= won
+
+        self.episode_return += rewards
+        finished = games[dones]
+        self.games_played += len(finished)
+        self.games_won += int(np.count_nonzero(won))
+        self.returns.extend(self.episode_return[finished].tolist())
+        self.reset_games(finished)
+
+        return self.observations(), rewards, dones
+
+    def _make_first_moves_safe(self, games, xs, ys):
+        """Move a mine out of the way of each game's first click"""
+        for game, x, y in zip(games, xs, ys):
+            if self.mine[game, x, y]:
+                free = np.flatnonzero(~self.mine[game].ravel())
+                target = free[self.rng.integers(len(free))]
+                self.mine[game, x, y] = False
+                self.mine[game].flat[target] = True
+                self.clues[game] = count_adjacent(self.mine[game])
+
+    def _flood_fill(self, clicked):
+        """Cells revealed by clicking every marked cell, for all games at once
+
+        The region grows one ring per iteration from the empty cells found so
+        far, stopping at clues, flags and cells that are already revealed.
+        """
+        region = clicked
+        open_cells = ~self.revealed & ~self.flagged & ~self.mine
+        while True:
+            empty = region & (self.clues == 0)
+            grown = region | ((count_adjacent(empty) > 0) & open_cells)
+            if np.array_equal(grown, region):
+                return region
+            region = grown
+
+def play_games(net, env, num_games):
+    """Play at least num_games games with a batched network; return the finished returns
+
+    The boards are fitted to the network's input grid with a BoardEncoder,
+    so the environment may be of any size.
+    """
+    encoder = BoardEncoder.for_network(net)
+    shape = (env.num_games, env.rows, env.cols)
+    observations = env.observations()
+    start = len(env.returns)
+    while len(env.returns) - start < num_games:
+        outputs = net.activate_batch(encoder.encode_batch(observations.reshape(shape)))
+        scores = encoder.decode_batch(outputs, env.rows, env.cols).reshape(env.num_games, -1)
+        scores = np.where(env.valid_moves(), scores, -np.inf)
+        observations, _, _ = env.step(np.argmax(scores, axis=1))
+    return env.returns[start:]